@@ -1,9 +1,20 @@
+import sys
 import importlib.util
 
-packages = ['pypdf', 'PyPDF2', 'pdfminer', 'pdfplumber', 'reportlab', 'xhtml2pdf']
-found = {}
+from pdf_backends import BACKENDS, rank_backends, print_benchmark
 
-for pkg in packages:
-    spec = importlib.util.find_spec(pkg)
-    found[pkg] = spec is not None
-    print(f"{pkg}: {found[pkg]}")
+# Report renderers (no text extraction backend)
+render_packages = ['reportlab', 'xhtml2pdf']
+
+for name, backend in BACKENDS.items():
+    print(f"{name}: {backend.available}")
+
+for pkg in render_packages:
+    print(f"{pkg}: {importlib.util.find_spec(pkg) is not None}")
+
+# Rank extraction backends on a local corpus: python check_pdf_libs.py a.pdf b.pdf ...
+if len(sys.argv) > 1:
+    print()
+    ranking, results = rank_backends(sys.argv[1:])
+    print_benchmark(ranking, results)
+    print(f"\nExtraction order: {' > '.join(ranking)}")
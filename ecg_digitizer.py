@@ -0,0 +1,622 @@
+"""
+ECG Image Digitization
+======================
+
+Turns a printed 12-lead ECG image (scan, photo crop or export) into
+per-lead time series, so indexing, retrieval and fast classifiers can work
+on signals (tens of KB) instead of multi-megabyte RGB images.
+
+Pipeline (vectorized NumPy, no OpenCV/SciPy):
+    1. Trace mask: pixels dark in every channel; pink/red grids are bright in
+       one channel, grey grids sit between the ink and the paper
+    2. Grid pitch: autocorrelation of the grid-line profile gives px per mm
+       (1 mm minor / 5 mm major boxes) along x and y
+    3. Rows: peaks of the trace row-projection (one baseline per printed row);
+       the row count selects 3x4 (plus 0-3 rhythm strips) or 12x1. Six rows
+       are 3x4 plus three strips only when the strips repeat the grid leads
+       above them; a 6x2 print must be requested (layout='6x2', --layout 6x2)
+    4. Calibration: a 1 mV / 0.2 s pulse at the start of a row, when printed,
+       sets the vertical scale (otherwise 10 mm/mV from the grid)
+    5. Trace: vertical pixel runs are extracted per column and the run
+       connected to the previous column is followed (skipping lead labels);
+       its centre is the sample, or its end at the tip of a QRS spike
+    6. Each lead segment is referenced to its median (isoelectric) level and
+       resampled to a fixed rate
+
+Standard paper speed (25 mm/s) is assumed when a grid is found; otherwise
+the printed rows are taken to span 10 s.
+
+Usage:
+    from ecg_digitizer import digitize, DigitizedECG
+    
+    ecg = digitize("ecg_new_img_2.png")
+    ecg.leads["V2"]              # float32 mV at ecg.fs
+    ecg.save("ecg_new_img_2.npz")
+    signals = DigitizedECG.load("ecg_new_img_2.npz").to_array()   # [12, 10 * fs], NaN where not printed
+    
+    python ecg_digitizer.py an_ecg.jpg ecg_new4.jpg --out-dir digitized/
+    python ecg_digitizer.py --evaluate 20      # accuracy/speed on synthetic_corpus ECGs
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+
+LEADS = ('I', 'II', 'III', 'aVR', 'aVL', 'aVF', 'V1', 'V2', 'V3', 'V4', 'V5', 'V6')
+LAYOUTS = {
+    '3x4': (('I', 'aVR', 'V1', 'V4'), ('II', 'aVL', 'V2', 'V5'), ('III', 'aVF', 'V3', 'V6')),
+    '6x2': (('I', 'V1'), ('II', 'V2'), ('III', 'V3'), ('aVR', 'V4'), ('aVL', 'V5'), ('aVF', 'V6')),
+    '12x1': tuple((lead,) for lead in LEADS),
+}
+# Rhythm strips printed below a 3x4 layout, by number of extra rows
+RHYTHM_LEADS = {1: ('II',), 2: ('II', 'V1'), 3: ('V1', 'II', 'V5')}
+
+DEFAULT_FS = 250
+RECORD_SECONDS = 10.0
+MM_PER_SEC = 25.0
+MM_PER_MV = 10.0
+
+
+@dataclass
+class DigitizedECG:
+    """Per-lead signals digitized from one ECG image."""
+    fs: int
+    leads: dict                  # lead -> float32 mV; rhythm strips as 'rhythm_<lead>'
+    offsets: dict                # lead -> start time (s) within the RECORD_SECONDS recording
+    layout: str
+    px_per_sec: float
+    px_per_mv: float
+    px_per_mm: Optional[float]   # None when no grid was detected
+    calibration_pulse: bool
+    image_shape: tuple
+    missing: list = field(default_factory=list)   # printed leads with no usable trace
+    
+    def to_array(self, prefer_rhythm=True):
+        """
+        [12, RECORD_SECONDS * fs] float32 in LEADS order, NaN where a lead was not printed.
+        
+        Args:
+            prefer_rhythm: Fill a lead from its full-length rhythm strip when one exists
+        """
+        n = int(round(RECORD_SECONDS * self.fs))
+        signals = np.full((len(LEADS), n), np.nan, dtype=np.float32)
+        names = sorted(self.leads, key=lambda name: name.startswith('rhythm_') == prefer_rhythm)
+        for name in names:
+            lead = name[len('rhythm_'):] if name.startswith('rhythm_') else name
+            if lead not in LEADS:
+                continue
+            start = int(round(self.offsets[name] * self.fs))
+            values = self.leads[name][:max(n - start, 0)]
+            signals[LEADS.index(lead), start:start + len(values)] = values
+        return signals
+    
+    def save(self, path):
+        """Write as compressed .npz: one int16 uV array for all leads, plus JSON metadata."""
+        names = list(self.leads)
+        data = np.concatenate([self.leads[name] for name in names]) if names else np.zeros(0)
+        meta = {
+            'fs': self.fs, 'names': names, 'lengths': [len(self.leads[name]) for name in names],
+            'offsets': [self.offsets[name] for name in names], 'layout': self.layout,
+            'px_per_sec': self.px_per_sec, 'px_per_mv': self.px_per_mv, 'px_per_mm': self.px_per_mm,
+            'calibration_pulse': self.calibration_pulse, 'image_shape': list(self.image_shape),
+            'missing': self.missing,
+        }
+        np.savez_compressed(path, signals_uv=np.clip(np.round(data * 1000), -32768, 32767).astype(np.int16),
+                            meta=np.array(json.dumps(meta)))
+    
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            data = f['signals_uv'].astype(np.float32) / 1000
+            meta = json.loads(str(f['meta']))
+        chunks = np.split(data, np.cumsum(meta['lengths'])[:-1]) if meta['names'] else []
+        return cls(
+            fs=meta['fs'],
+            leads=dict(zip(meta['names'], chunks)),
+            offsets=dict(zip(meta['names'], meta['offsets'])),
+            layout=meta['layout'],
+            px_per_sec=meta['px_per_sec'],
+            px_per_mv=meta['px_per_mv'],
+            px_per_mm=meta['px_per_mm'],
+            calibration_pulse=meta['calibration_pulse'],
+            image_shape=tuple(meta['image_shape']),
+            missing=meta['missing'],
+        )
+
+
+def load_rgb(image):
+    """[H, W, 3] uint8 array from a path, PIL image or array."""
+    if isinstance(image, np.ndarray):
+        if image.ndim == 2:
+            return np.repeat(image[:, :, None], 3, axis=2)
+        return image[:, :, :3]
+    from PIL import Image
+    if isinstance(image, (str, os.PathLike)):
+        image = Image.open(image)
+    return np.asarray(image.convert('RGB'))
+
+
+def paper_color(rgb):
+    """RGB of the paper: median color of the brightest quarter of pixels (grids can cover most of the page)."""
+    sample = rgb[::4, ::4].reshape(-1, 3)
+    level = sample.max(axis=1)
+    return np.median(sample[level >= np.percentile(level, 75)], axis=0)
+
+
+def _off_paper(rgb, paper):
+    return np.abs(rgb.astype(np.int16) - paper.astype(np.int16)).sum(axis=-1) > 45
+
+
+def trace_mask(rgb, threshold=None):
+    """
+    Boolean mask of trace (and text) pixels: dark in every channel.
+    
+    Grid lines are light or strongly colored (pink/red), so the brightest
+    channel separates them from the black trace. Grey grids can print nearly
+    as dark as half the paper level; the threshold then sits halfway between
+    the ink and the grid lines.
+    """
+    brightest = rgb.max(axis=2)
+    if threshold is None:
+        paper = paper_color(rgb)
+        level = brightest[::4, ::4]
+        lines = level[_off_paper(rgb[::4, ::4], paper)]
+        threshold = 0.5 * paper.max()
+        if lines.size:
+            threshold = min(threshold, 0.5 * (np.percentile(level, 0.5) + np.median(lines)))
+    return brightest < threshold
+
+
+def grid_mask(rgb, trace):
+    """Boolean mask of grid pixels: off the paper color but not trace."""
+    return _off_paper(rgb, paper_color(rgb)) & ~trace
+
+
+def _peak_near(ac, lag, radius):
+    """Sub-pixel lag of the autocorrelation maximum within lag +/- radius."""
+    lo, hi = max(int(round(lag - radius)), 1), min(int(round(lag + radius)), len(ac) - 2)
+    if hi < lo:
+        return float(lag), 0.0
+    i = lo + int(np.argmax(ac[lo:hi + 1]))
+    denominator = ac[i - 1] - 2 * ac[i] + ac[i + 1]
+    shift = 0.5 * (ac[i - 1] - ac[i + 1]) / denominator if denominator < 0 else 0.0
+    return i + shift, float(ac[i])
+
+
+def grid_pitch(profile, min_lag=2, expected=None):
+    """
+    Pixels per mm from a 1-D grid-line profile (grid pixel share per column or row).
+    
+    Args:
+        profile: Grid pixel share per column (or row)
+        min_lag: Smallest line spacing considered, in pixels
+        expected: Rough px per mm (e.g. trace width / 250 mm); decides between
+            1 mm and 5 mm lines when both print equally strong
+    
+    Returns:
+        px per mm, or None when the profile shows no periodic grid
+    """
+    p = profile.astype(np.float64) - profile.mean()
+    n = len(p)
+    if n < 64 or not p.any():
+        return None
+    spectrum = np.fft.rfft(p, 2 * n)
+    ac = np.fft.irfft(spectrum * np.conj(spectrum))[:n]
+    ac /= ac[0]
+    
+    lags = np.arange(max(min_lag, 1), n // 4)
+    is_peak = (ac[lags] > ac[lags - 1]) & (ac[lags] >= ac[lags + 1]) & (ac[lags] > 0.1)
+    if not is_peak.any():
+        return None
+    first = _peak_near(ac, lags[is_peak][0], 1)[0]
+    
+    # 1 mm lines visible: every 5th peak (a 5 mm line) is stronger than the 2nd/3rd
+    major = first
+    if expected:
+        if abs(np.log(first / expected)) < abs(np.log(first / 5 / expected)):
+            major = 5 * first
+    elif 5 * first < n // 2:
+        five = _peak_near(ac, 5 * first, 1)[1]
+        if five > max(_peak_near(ac, 2 * first, 1)[1], _peak_near(ac, 3 * first, 1)[1]) + 0.05:
+            major = 5 * first
+    
+    # Refine on doubling multiples of the major period while their peaks hold
+    period = _peak_near(ac, major, 1)[0]
+    multiple = 2
+    while multiple * period < n // 3:
+        lag, strength = _peak_near(ac, multiple * period, 2)
+        if strength < 0.05:
+            break
+        period = lag / multiple
+        multiple *= 2
+    return period / 5
+
+
+def find_rows(trace, px_per_mm=None, min_spacing_mm=12.0, min_share=0.3):
+    """
+    Baseline y of each printed row: peaks of the smoothed trace row-projection.
+    """
+    height, image_width = trace.shape
+    projection = trace.sum(axis=1).astype(np.float64)
+    # Frame rules run edge to edge; a trace never covers a whole line
+    projection[projection > 0.9 * image_width] = 0.0
+    width = max(3, int(round(px_per_mm or 3)))
+    projection = np.convolve(projection, np.ones(width) / width, mode='same')
+    
+    min_spacing = min_spacing_mm * px_per_mm if px_per_mm else height / 14
+    y = np.arange(1, height - 1)
+    candidates = y[(projection[y] >= projection[y - 1]) & (projection[y] > projection[y + 1]) &
+                   (projection[y] > min_share * projection.max())]
+    rows = []
+    for candidate in candidates[np.argsort(-projection[candidates])]:
+        if all(abs(candidate - row) >= min_spacing for row in rows):
+            rows.append(int(candidate))
+    if not rows:
+        return rows
+    
+    # Printed rows span the page; header/footer text lines only part of it
+    half = int(min_spacing // 2)
+    coverage = np.array([trace[max(0, row - half):row + half].any(axis=0).mean() for row in rows])
+    return sorted(row for row, share in zip(rows, coverage) if share >= 0.5 * coverage.max())
+
+
+def choose_layout(n_rows, layout='auto'):
+    """
+    (layout name, row lead names) for a row count; rows below the layout are 1-3 rhythm strips.
+    
+    'auto' picks 12x1 for 12 or more rows and 3x4 otherwise. Six rows may be
+    3x4 plus V1/II/V5 strips or 6x2, which the row count cannot tell apart:
+    pass the layout explicitly (digitize checks the traces first, see
+    rhythm_strips_repeat_grid).
+    
+    Raises:
+        ValueError: If the row count does not fit the layout plus 0-3 rhythm
+            strips, or is ambiguous under 'auto'
+    """
+    if layout == 'auto':
+        if n_rows == len(LAYOUTS['6x2']):
+            raise ValueError(f"Found {n_rows} printed rows: 3x4 with {max(RHYTHM_LEADS)} rhythm strips "
+                             f"or 6x2; pass the layout explicitly")
+        layout = '12x1' if n_rows >= 12 else '3x4'
+    rows = list(LAYOUTS[layout])
+    extra = n_rows - len(rows)
+    if extra < 0 or extra > max(RHYTHM_LEADS):
+        raise ValueError(f"Found {n_rows} printed rows, {layout} layout needs {len(rows)} "
+                         f"plus at most {max(RHYTHM_LEADS)} rhythm strips")
+    rows += [(f"rhythm_{lead}",) for lead in RHYTHM_LEADS.get(extra, ())]
+    return layout, rows
+
+
+def _correlation(a, b):
+    """Pearson correlation over columns traced in both (NaN if too few)."""
+    both = np.isfinite(a) & np.isfinite(b)
+    if both.sum() < 10 or np.std(a[both]) == 0 or np.std(b[both]) == 0:
+        return np.nan
+    return float(np.corrcoef(a[both], b[both])[0, 1])
+
+
+def rhythm_strips_repeat_grid(row_values, min_correlation=0.8):
+    """
+    Whether six traced rows are a 3x4 grid plus V1/II/V5 rhythm strips.
+    
+    Each strip repeats the lead printed in the same quarter of the grid
+    (II in the first quarter, V1 in the third, V5 in the fourth), so the
+    traces agree there; the rows of a 6x2 print are all different leads.
+    
+    Args:
+        row_values: Per-row track_trace output over the shared trace extent
+        min_correlation: Median strip-vs-grid correlation required
+    """
+    grid = LAYOUTS['3x4']
+    width = min(len(values) for values in row_values)
+    correlations = []
+    for strip, lead in enumerate(RHYTHM_LEADS[len(row_values) - len(grid)]):
+        row = next(i for i, leads in enumerate(grid) if lead in leads)
+        col = grid[row].index(lead)
+        a = int(round(col * width / len(grid[row])))
+        b = int(round((col + 1) * width / len(grid[row])))
+        correlations.append(_correlation(row_values[len(grid) + strip][a:b], row_values[row][a:b]))
+    correlations = [c for c in correlations if np.isfinite(c)]
+    return bool(correlations) and float(np.median(correlations)) >= min_correlation
+
+
+def column_runs(band):
+    """
+    Vertical runs of dark pixels in every column of a band.
+    
+    Returns:
+        (cols, starts, ends) int arrays sorted by column then row; ends inclusive
+    """
+    height, width = band.shape
+    padded = np.zeros((width, height + 2), np.int8)
+    padded[:, 1:-1] = band.T
+    edges = np.diff(padded, axis=1)
+    cols, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    return cols, starts, ends - 1
+
+
+def detect_calibration(band, x0, px_per_mm_x, px_per_mm_y):
+    """
+    Find a 1 mV calibration pulse at the start of a row: two single
+    vertical strokes >= 6 mm tall, 3-8 mm apart, with matching tops and bottoms.
+    
+    Returns:
+        (pulse height in px or None, first trace column after the pulse)
+    """
+    cols, starts, ends = column_runs(band[:, x0:x0 + int(15 * px_per_mm_x)])
+    tall = (ends - starts) >= 6 * px_per_mm_y
+    cols, starts, ends = cols[tall], starts[tall], ends[tall]
+    if len(cols) < 2:
+        return None, x0
+    first, last = 0, len(cols) - 1
+    separation = cols[last] - cols[first]
+    if not 3 * px_per_mm_x <= separation <= 8 * px_per_mm_x:
+        return None, x0
+    if abs(starts[last] - starts[first]) > px_per_mm_y or abs(ends[last] - ends[first]) > px_per_mm_y:
+        return None, x0
+    return float(np.median(ends - starts)), x0 + int(cols[last]) + 2
+
+
+def track_trace(band, start_y):
+    """
+    Follow the trace through a band: one y per column (NaN where no trace).
+    
+    Vertical runs of dark pixels are found for all columns at once; the
+    per-column choice keeps the run connected to the previous column (so
+    labels and neighbouring rows' spikes are skipped) and takes its centre,
+    or its far end where a steep stroke turns (the tip of a spike).
+    """
+    width = band.shape[1]
+    cols, starts, ends = column_runs(band)
+    lengths = ends - starts + 1
+    thick = float(np.median(lengths)) * 2.0 if len(lengths) else 3.0
+    
+    bounds = np.searchsorted(cols, np.arange(width + 1)).tolist()
+    run_starts, run_ends = starts.tolist(), ends.tolist()
+    top = np.full(width, np.nan)
+    bottom = np.full(width, np.nan)
+    prev = float(start_y)
+    for c in range(width):
+        a, b = bounds[c], bounds[c + 1]
+        if a == b:
+            continue
+        best, best_distance = a, None
+        for i in range(a, b):
+            distance = max(run_starts[i] - prev, 0.0) + max(prev - run_ends[i], 0.0)
+            if best_distance is None or distance < best_distance:
+                best, best_distance = i, distance
+        top[c], bottom[c] = run_starts[best], run_ends[best]
+        prev = 0.5 * (top[c] + bottom[c])
+    
+    # Run centres, except at the tips of steep strokes (R peaks, S troughs)
+    # where the stroke's extreme end is the sample
+    values = 0.5 * (top + bottom)
+    padded_top = np.pad(top, 1, constant_values=np.inf)
+    padded_bottom = np.pad(bottom, 1, constant_values=-np.inf)
+    with np.errstate(invalid='ignore'):
+        long_run = bottom - top + 1 > thick
+        peak = long_run & (top < np.fmin(padded_top[:-2], padded_top[2:]) + 0.5)
+        trough = long_run & (bottom > np.fmax(padded_bottom[:-2], padded_bottom[2:]) - 0.5)
+    values[peak & ~trough] = top[peak & ~trough]
+    values[trough & ~peak] = bottom[trough & ~peak]
+    return values
+
+
+def _resample(values, px_per_sec, seconds, fs, margin):
+    """Column values -> fs samples over `seconds`; edge columns (separators) dropped."""
+    if margin:
+        values = values.copy()
+        values[:margin] = np.nan
+        values[-margin:] = np.nan
+    valid = np.isfinite(values)
+    if valid.sum() < max(10, 0.1 * len(values)):
+        return None
+    t = (np.nonzero(valid)[0] + 0.5) / px_per_sec
+    target = np.arange(int(round(seconds * fs))) / fs
+    return np.interp(target, t, values[valid])
+
+
+def digitize(image, fs=DEFAULT_FS, layout='auto', threshold=None):
+    """
+    Digitize one 12-lead ECG printout.
+    
+    Args:
+        image: Path, PIL image or [H, W, 3] uint8 array
+        fs: Output sampling rate (Hz)
+        layout: 'auto' (3x4 or 12x1, see choose_layout), '3x4', '6x2' or '12x1';
+            rows beyond it are rhythm strips. Under 'auto', six rows are read
+            as 3x4 plus strips only if the strips repeat the grid leads
+        threshold: Trace darkness threshold on the brightest channel (default: from the paper and grid levels)
+    
+    Returns:
+        DigitizedECG
+    
+    Raises:
+        ValueError: If the rows do not fit the layout (or six rows under 'auto'
+            are not 3x4 plus rhythm strips) or no lead could be traced
+    """
+    rgb = load_rgb(image)
+    height, width = rgb.shape[:2]
+    trace = trace_mask(rgb, threshold)
+    grid = grid_mask(rgb, trace)
+    active = np.nonzero(trace.any(axis=0))[0]
+    expected = (active[-1] - active[0]) / (RECORD_SECONDS * MM_PER_SEC) if len(active) > 1 else None
+    px_per_mm_x = grid_pitch(grid.mean(axis=0), expected=expected)
+    px_per_mm_y = grid_pitch(grid.mean(axis=1), expected=expected)
+    if px_per_mm_x and px_per_mm_y and not 0.8 < px_per_mm_x / px_per_mm_y < 1.25:
+        px_per_mm_x = px_per_mm_y = None   # inconsistent: not a regular grid
+    
+    rows = find_rows(trace, px_per_mm_y)
+    # Six rows under 'auto' are resolved from the traces below
+    if not (layout == 'auto' and len(rows) == len(LAYOUTS['6x2'])):
+        layout, row_leads = choose_layout(len(rows), layout)
+    
+    # Row bands halfway to the neighbouring baselines
+    spacing = np.diff(rows).min() if len(rows) > 1 else height
+    edges = [max(0, rows[0] - spacing // 2)] + [(a + b) // 2 for a, b in zip(rows, rows[1:])]
+    edges.append(min(height, rows[-1] + spacing // 2))
+    bands = [(edges[i], edges[i + 1]) for i in range(len(rows))]
+    
+    # Trace extent per row, after any calibration pulse
+    extents, pulses = [], []
+    for y0, y1 in bands:
+        active = np.nonzero(trace[y0:y1].any(axis=0))[0]
+        if not len(active):
+            extents.append(None)
+            continue
+        x0, x1 = int(active[0]), int(active[-1]) + 1
+        if px_per_mm_x:
+            pulse, x0 = detect_calibration(trace[y0:y1], x0, px_per_mm_x, px_per_mm_y)
+            if pulse:
+                pulses.append(pulse)
+        extents.append((x0, x1))
+    found = [e for e in extents if e is not None]
+    if not found:
+        raise ValueError("No ECG trace found")
+    x0 = int(np.median([e[0] for e in found]))
+    x1 = int(np.median([e[1] for e in found]))
+    
+    # Time scale: grid at 25 mm/s, unless it disagrees with a 10 s row
+    px_per_sec = (x1 - x0) / RECORD_SECONDS
+    if px_per_mm_x and abs(px_per_mm_x * MM_PER_SEC / px_per_sec - 1) < 0.2:
+        px_per_sec = px_per_mm_x * MM_PER_SEC
+    if pulses:
+        px_per_mv = float(np.median(pulses))
+    elif px_per_mm_y:
+        px_per_mv = px_per_mm_y * MM_PER_MV
+    else:
+        px_per_mv = px_per_sec / MM_PER_SEC * MM_PER_MV
+    
+    row_values = [track_trace(trace[y0:y1, x0:x1], baseline - y0) for (y0, y1), baseline in zip(bands, rows)]
+    if layout == 'auto':
+        # Six rows: 3x4 plus rhythm strips, or a 6x2 print that must be requested
+        if not rhythm_strips_repeat_grid(row_values):
+            raise ValueError(f"Found {len(rows)} printed rows whose last {max(RHYTHM_LEADS)} do not repeat "
+                             f"3x4 grid leads; pass layout='6x2' for a 6x2 print")
+        layout, row_leads = choose_layout(len(rows), '3x4')
+    
+    margin = int(round(0.6 * (px_per_mm_x or px_per_sec / MM_PER_SEC)))
+    leads, offsets, missing = {}, {}, []
+    for values, names in zip(row_values, row_leads):
+        n_cols = len(names)
+        seconds = RECORD_SECONDS / n_cols
+        for k, name in enumerate(names):
+            a = int(round(k * (x1 - x0) / n_cols))
+            b = int(round((k + 1) * (x1 - x0) / n_cols))
+            segment = _resample(values[a:b], px_per_sec, seconds, fs, margin if n_cols > 1 else 0)
+            if segment is None:
+                missing.append(name)
+                continue
+            # Image y grows downwards; reference to the median (isoelectric) level
+            leads[name] = ((np.median(segment) - segment) / px_per_mv).astype(np.float32)
+            offsets[name] = k * seconds
+    if not leads:
+        raise ValueError(f"No ECG trace found in any of the {len(missing)} lead segments")
+    
+    return DigitizedECG(
+        fs=fs,
+        leads=leads,
+        offsets=offsets,
+        layout=layout,
+        px_per_sec=float(px_per_sec),
+        px_per_mv=float(px_per_mv),
+        px_per_mm=float(px_per_mm_x) if px_per_mm_x else None,
+        calibration_pulse=bool(pulses),
+        image_shape=(height, width),
+        missing=missing,
+    )
+
+
+def evaluate_synthetic(count=20, seed=0, fs=DEFAULT_FS):
+    """
+    Digitize synthetic_corpus ECG images and compare with their true signals.
+    
+    Returns:
+        Dict with images, ms_per_image, per-lead mean correlation, median
+        RMSE (mV) and stored size vs the PNG and the decoded RGB image
+    """
+    import io
+    from synthetic_corpus import SCENARIOS, ECG_FS, case_rng, synthesize_ecg, render_ecg
+    
+    scenarios = list(SCENARIOS)
+    correlations, errors, elapsed, stored, png, rgb_bytes = [], [], 0.0, 0, 0, 0
+    for index in range(count):
+        signals, _ = synthesize_ecg(case_rng(seed, index, 1), SCENARIOS[scenarios[index % len(scenarios)]]['ecg'])
+        image = render_ecg(signals)
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG')
+        png += buffer.tell()
+        rgb = load_rgb(image)
+        rgb_bytes += rgb.nbytes
+        
+        start = time.perf_counter()
+        ecg = digitize(rgb, fs)
+        elapsed += time.perf_counter() - start
+        out = io.BytesIO()
+        ecg.save(out)
+        stored += out.tell()
+        
+        for name, values in ecg.leads.items():
+            lead = name[len('rhythm_'):] if name.startswith('rhythm_') else name
+            t = ecg.offsets[name] + np.arange(len(values)) / fs
+            truth = np.interp(t, np.arange(signals.shape[1]) / ECG_FS, signals[LEADS.index(lead)])
+            truth = truth - np.median(truth)
+            values = values - np.median(values)
+            correlations.append(float(np.corrcoef(truth, values)[0, 1]))
+            errors.append(float(np.sqrt(np.mean((truth - values) ** 2))))
+    
+    return {
+        'images': count,
+        'ms_per_image': 1000 * elapsed / count,
+        'mean_correlation': float(np.mean(correlations)),
+        'median_rmse_mv': float(np.median(errors)),
+        'kb_per_record': stored / count / 1024,
+        'smaller_than_png': png / stored,
+        'smaller_than_rgb': rgb_bytes / stored,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Digitize 12-lead ECG images into per-lead signals")
+    parser.add_argument("images", nargs="*")
+    parser.add_argument("--out-dir", help="Write <image>.npz here")
+    parser.add_argument("--fs", type=int, default=DEFAULT_FS)
+    parser.add_argument("--layout", choices=('auto',) + tuple(LAYOUTS), default='auto')
+    parser.add_argument("--evaluate", type=int, metavar="N", help="Score N synthetic ECGs against ground truth")
+    args = parser.parse_args(argv)
+    
+    if args.evaluate:
+        print(json.dumps(evaluate_synthetic(args.evaluate, fs=args.fs), indent=2))
+        return
+    
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+    for path in args.images:
+        start = time.perf_counter()
+        try:
+            ecg = digitize(path, args.fs, args.layout)
+        except ValueError as e:
+            print(f"{path}: {e}")
+            continue
+        elapsed = time.perf_counter() - start
+        mm = f"{ecg.px_per_mm:.2f} px/mm" if ecg.px_per_mm else "no grid"
+        print(f"{path}: {ecg.layout}, {len(ecg.leads)} leads, {mm}, {ecg.px_per_mv:.1f} px/mV"
+              f"{' (calibration pulse)' if ecg.calibration_pulse else ''}, {1000 * elapsed:.0f} ms"
+              f"{', missing ' + ', '.join(ecg.missing) if ecg.missing else ''}")
+        if args.out_dir:
+            out = os.path.join(args.out_dir, os.path.splitext(os.path.basename(path))[0] + ".npz")
+            ecg.save(out)
+            print(f"  -> {out} ({os.path.getsize(out) / 1024:.1f} KB, "
+                  f"{os.path.getsize(path) / os.path.getsize(out):.0f}x smaller than the image file)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
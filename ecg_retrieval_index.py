@@ -0,0 +1,467 @@
+"""
+Similar-ECG Retrieval Index
+===========================
+
+Persistent, memory-mapped index over the pooled embeddings produced by
+EdgeVisionEncoder.get_pooled_embedding, used to find the most similar
+prior ECGs in a library of past cases.
+
+Embeddings are L2-normalized on insert, so cosine similarity is a single
+matmul. Search is exact by default (chunked NumPy matmul over the memmap);
+for large libraries an IVF (inverted file) mode clusters the vectors with
+spherical k-means and only scores the closest clusters.
+
+On-disk layout (index_dir/):
+    index.json          dim, row count, capacity
+    embeddings.f32      [capacity, dim] float32 memmap, unit-norm rows
+    alive.u8            [capacity] uint8 memmap, 0 = deleted (tombstone)
+    ivf_assign.i32      [capacity] int32 memmap, IVF list of each row (-1 = none)
+    ivf_centroids.npy   [nlist, dim] float32 IVF centroids
+    metadata.jsonl      one JSON object per row (case_id, diagnosis, ...)
+
+Usage:
+    from edge_inference import EdgeVisionEncoder
+    from ecg_retrieval_index import ECGEmbeddingIndex
+    
+    encoder = EdgeVisionEncoder("./onnx_export")
+    embedding = encoder.get_pooled_embedding("an_ecg.jpg")
+    
+    index = ECGEmbeddingIndex("./ecg_index", dim=embedding.shape[0])
+    index.add(embedding, {"case_id": "case-001", "diagnosis": "STEMI"})
+    index.add_image(encoder, "ecg_new_3.jpg", case_id="case-002", diagnosis="AF")
+    
+    matches = index.search(encoder.get_pooled_embedding("ecg_new4.jpg"), top_k=5)
+"""
+
+import os
+import json
+import time
+import numpy as np
+
+
+class ECGEmbeddingIndex:
+    """
+    On-disk cosine-similarity index with incremental add/delete and
+    batched top-k search (exact or IVF approximate).
+    """
+    
+    def __init__(self, index_dir, dim=None, initial_capacity=1024, chunk_rows=65536):
+        """
+        Open an existing index or create a new one.
+        
+        Args:
+            index_dir: Directory holding the index files
+            dim: Embedding dimension (required when creating a new index)
+            initial_capacity: Rows preallocated for a new index (grows by doubling)
+            chunk_rows: Rows scored per matmul block during exact search
+        """
+        self.index_dir = index_dir
+        self.chunk_rows = chunk_rows
+        self._header_path = os.path.join(index_dir, "index.json")
+        self._metadata_path = os.path.join(index_dir, "metadata.jsonl")
+        self._centroids_path = os.path.join(index_dir, "ivf_centroids.npy")
+        
+        if os.path.exists(self._header_path):
+            with open(self._header_path, 'r') as f:
+                header = json.load(f)
+            if dim is not None and dim != header['dim']:
+                raise ValueError(f"Index at {index_dir} has dim {header['dim']}, not {dim}")
+            self.dim = header['dim']
+            self._count = header['count']
+            self._capacity = header['capacity']
+        else:
+            if dim is None:
+                raise ValueError(f"No index found at {index_dir}; pass dim to create one")
+            os.makedirs(index_dir, exist_ok=True)
+            self.dim = int(dim)
+            self._count = 0
+            self._capacity = max(int(initial_capacity), 1)
+            for name, itemsize in self._column_files():
+                with open(os.path.join(index_dir, name), 'wb') as f:
+                    f.truncate(self._capacity * itemsize)
+            open(self._metadata_path, 'w').close()
+            self._write_header()
+        
+        self._open_memmaps()
+        if self._count == 0:
+            self._assign[:] = -1
+        
+        # Metadata and the case_id -> row lookup live in memory
+        self._metadata = []
+        with open(self._metadata_path, 'r') as f:
+            for line in f:
+                self._metadata.append(json.loads(line))
+        self._metadata = self._metadata[:self._count]
+        self._case_rows = {}
+        for row, meta in enumerate(self._metadata):
+            case_id = meta.get('case_id')
+            if case_id is not None and self._alive[row]:
+                self._case_rows[case_id] = row
+        
+        if os.path.exists(self._centroids_path):
+            self._centroids = np.load(self._centroids_path)
+        else:
+            self._centroids = None
+        self._ivf_lists = None
+    
+    def _column_files(self):
+        """(file name, bytes per row) for every memmapped column."""
+        return [
+            ("embeddings.f32", self.dim * 4),
+            ("alive.u8", 1),
+            ("ivf_assign.i32", 4),
+        ]
+    
+    def _open_memmaps(self):
+        path = lambda name: os.path.join(self.index_dir, name)
+        self._embeddings = np.memmap(path("embeddings.f32"), dtype=np.float32, mode='r+',
+                                     shape=(self._capacity, self.dim))
+        self._alive = np.memmap(path("alive.u8"), dtype=np.uint8, mode='r+',
+                                shape=(self._capacity,))
+        self._assign = np.memmap(path("ivf_assign.i32"), dtype=np.int32, mode='r+',
+                                 shape=(self._capacity,))
+    
+    def _write_header(self):
+        header = {
+            'dim': self.dim,
+            'count': self._count,
+            'capacity': self._capacity,
+        }
+        tmp_path = self._header_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(header, f)
+        os.replace(tmp_path, self._header_path)
+    
+    def _grow(self, needed):
+        """Double capacity until `needed` rows fit, extending the files in place."""
+        new_capacity = self._capacity
+        while new_capacity < needed:
+            new_capacity *= 2
+        if new_capacity == self._capacity:
+            return
+        
+        self.flush()
+        del self._embeddings, self._alive, self._assign
+        for name, itemsize in self._column_files():
+            with open(os.path.join(self.index_dir, name), 'r+b') as f:
+                f.truncate(new_capacity * itemsize)
+        old_capacity = self._capacity
+        self._capacity = new_capacity
+        self._open_memmaps()
+        self._assign[old_capacity:] = -1
+        self._write_header()
+    
+    def __len__(self):
+        """Number of live (non-deleted) entries."""
+        return int(np.count_nonzero(self._alive[:self._count]))
+    
+    @staticmethod
+    def _normalize(vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / (norms + 1e-8)
+    
+    def add(self, embeddings, metadata=None):
+        """
+        Append embeddings with optional per-row metadata.
+        
+        A row whose case_id is already indexed replaces that entry; within one
+        batch, the last row with a given case_id is the one kept.
+        
+        Args:
+            embeddings: [dim] or [n, dim] array of pooled embeddings
+            metadata: Dict or list of dicts (e.g. case_id, diagnosis) per row
+        
+        Returns:
+            List of row ids assigned to the new entries
+        """
+        vectors = self._normalize(embeddings)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected embeddings of dim {self.dim}, got {vectors.shape[1]}")
+        n = vectors.shape[0]
+        if metadata is None:
+            metadata = [{} for _ in range(n)]
+        elif isinstance(metadata, dict):
+            metadata = [metadata]
+        if len(metadata) != n:
+            raise ValueError(f"Got {n} embeddings but {len(metadata)} metadata entries")
+        
+        start = self._count
+        self._grow(start + n)
+        end = start + n
+        
+        # Re-adding a known case_id replaces the previous entry (repeats
+        # within this batch are tombstoned as the metadata is written)
+        for meta in metadata:
+            case_id = meta.get('case_id')
+            if case_id in self._case_rows:
+                self._alive[self._case_rows.pop(case_id)] = 0
+        
+        self._embeddings[start:end] = vectors
+        self._alive[start:end] = 1
+        if self._centroids is not None:
+            self._assign[start:end] = self._nearest_centroids(vectors)
+            self._ivf_lists = None
+        else:
+            self._assign[start:end] = -1
+        
+        with open(self._metadata_path, 'a') as f:
+            for row, meta in zip(range(start, end), metadata):
+                meta = dict(meta, id=row)
+                f.write(json.dumps(meta) + "\n")
+                self._metadata.append(meta)
+                case_id = meta.get('case_id')
+                if case_id is not None:
+                    if case_id in self._case_rows:
+                        self._alive[self._case_rows[case_id]] = 0
+                    self._case_rows[case_id] = row
+        
+        self._count = end
+        self._write_header()
+        return list(range(start, end))
+    
+    def add_image(self, encoder, image, **metadata):
+        """
+        Embed an ECG image with an EdgeVisionEncoder and add it to the index.
+        
+        Args:
+            encoder: EdgeVisionEncoder instance
+            image: PIL Image or path to image
+            **metadata: Stored alongside the embedding (case_id, diagnosis, ...)
+        
+        Returns:
+            Row id of the new entry
+        """
+        if isinstance(image, str):
+            metadata.setdefault('image', image)
+        return self.add(encoder.get_pooled_embedding(image), metadata)[0]
+    
+    def delete(self, ids=None, case_ids=None):
+        """
+        Tombstone entries by row id and/or case_id.
+        
+        Returns:
+            Number of entries deleted
+        """
+        rows = [int(i) for i in (ids or [])]
+        for case_id in case_ids or []:
+            if case_id in self._case_rows:
+                rows.append(self._case_rows[case_id])
+        
+        deleted = 0
+        for row in rows:
+            if 0 <= row < self._count and self._alive[row]:
+                self._alive[row] = 0
+                case_id = self._metadata[row].get('case_id')
+                if self._case_rows.get(case_id) == row:
+                    del self._case_rows[case_id]
+                deleted += 1
+        return deleted
+    
+    def get(self, row):
+        """Metadata stored for a row id."""
+        return self._metadata[row]
+    
+    def build_ivf(self, nlist=None, iterations=10, sample_size=20000, seed=0):
+        """
+        Cluster the stored embeddings for approximate search.
+        
+        Runs spherical k-means on a sample of live rows, then assigns every
+        row to its nearest centroid. Rows added later are assigned on insert;
+        rebuild after large changes to the library.
+        
+        Args:
+            nlist: Number of IVF lists (default: sqrt of live rows)
+            iterations: Lloyd iterations
+            sample_size: Rows used to train the centroids
+            seed: RNG seed for the sample and initial centroids
+        """
+        live_rows = np.flatnonzero(self._alive[:self._count])
+        if len(live_rows) == 0:
+            raise ValueError("Cannot build IVF on an empty index")
+        if nlist is None:
+            nlist = int(np.sqrt(len(live_rows)))
+        nlist = max(1, min(nlist, len(live_rows)))
+        
+        rng = np.random.default_rng(seed)
+        sample_rows = live_rows
+        if len(sample_rows) > sample_size:
+            sample_rows = np.sort(rng.choice(sample_rows, sample_size, replace=False))
+        sample = np.asarray(self._embeddings[sample_rows])
+        
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = ~np.bincount(labels, minlength=nlist).astype(bool)
+            sums[empty] = centroids[empty]
+            centroids = self._normalize(sums)
+        
+        self._centroids = centroids
+        np.save(self._centroids_path, centroids)
+        
+        for start in range(0, self._count, self.chunk_rows):
+            end = min(start + self.chunk_rows, self._count)
+            self._assign[start:end] = self._nearest_centroids(self._embeddings[start:end])
+        self._ivf_lists = None
+        self.flush()
+    
+    def _nearest_centroids(self, vectors):
+        return np.argmax(np.asarray(vectors) @ self._centroids.T, axis=1).astype(np.int32)
+    
+    @staticmethod
+    def _merge_top_k(best_scores, best_rows, scores, rows, top_k):
+        """Merge a block of candidate scores into the running per-query top-k."""
+        scores = np.concatenate([best_scores, scores], axis=1)
+        rows = np.concatenate([best_rows, np.broadcast_to(rows, (scores.shape[0], len(rows)))], axis=1)
+        if scores.shape[1] > top_k:
+            keep = np.argpartition(scores, -top_k, axis=1)[:, -top_k:]
+            scores = np.take_along_axis(scores, keep, axis=1)
+            rows = np.take_along_axis(rows, keep, axis=1)
+        return scores, rows
+    
+    def _search_exact(self, queries, top_k):
+        m = queries.shape[0]
+        best_scores = np.empty((m, 0), dtype=np.float32)
+        best_rows = np.empty((m, 0), dtype=np.int64)
+        for start in range(0, self._count, self.chunk_rows):
+            end = min(start + self.chunk_rows, self._count)
+            scores = queries @ self._embeddings[start:end].T
+            scores[:, self._alive[start:end] == 0] = -np.inf
+            best_scores, best_rows = self._merge_top_k(
+                best_scores, best_rows, scores, np.arange(start, end), top_k
+            )
+        return best_scores, best_rows
+    
+    def _get_ivf_lists(self):
+        """Rows grouped by IVF list: (rows sorted by list, list start offsets)."""
+        if self._ivf_lists is None:
+            assign = np.asarray(self._assign[:self._count])
+            order = np.argsort(assign, kind='stable')
+            counts = np.bincount(assign, minlength=len(self._centroids))
+            offsets = np.concatenate([[0], np.cumsum(counts)])
+            self._ivf_lists = (order, offsets)
+        return self._ivf_lists
+    
+    def _search_ivf(self, queries, top_k, nprobe):
+        m = queries.shape[0]
+        nprobe = min(nprobe, len(self._centroids))
+        probes = np.argpartition(queries @ self._centroids.T, -nprobe, axis=1)[:, -nprobe:]
+        order, offsets = self._get_ivf_lists()
+        
+        best_scores = np.full((m, top_k), -np.inf, dtype=np.float32)
+        best_rows = np.full((m, top_k), -1, dtype=np.int64)
+        for q in range(m):
+            candidates = np.sort(np.concatenate([order[offsets[p]:offsets[p + 1]] for p in probes[q]]))
+            candidates = candidates[self._alive[candidates] != 0]
+            if len(candidates) == 0:
+                continue
+            scores = self._embeddings[candidates] @ queries[q]
+            k = min(top_k, len(candidates))
+            keep = np.argpartition(scores, -k)[-k:]
+            best_scores[q, :k] = scores[keep]
+            best_rows[q, :k] = candidates[keep]
+        return best_scores, best_rows
+    
+    def search(self, queries, top_k=5, mode='exact', nprobe=8):
+        """
+        Find the most similar stored ECGs for one or more query embeddings.
+        
+        Args:
+            queries: [dim] or [m, dim] pooled embeddings
+            top_k: Matches returned per query
+            mode: 'exact' (full matmul) or 'ivf' (approximate, needs build_ivf)
+            nprobe: IVF lists scanned per query in 'ivf' mode
+        
+        Returns:
+            One list per query of match dicts (id, score and stored metadata),
+            best first. A single 1-D query returns a single list.
+        
+        Raises:
+            ValueError: top_k < 1, an unknown mode, or 'ivf' before build_ivf
+        """
+        if top_k < 1:
+            raise ValueError(f"top_k must be at least 1, got {top_k}")
+        single = np.ndim(queries) == 1
+        queries = self._normalize(queries)
+        if queries.shape[1] != self.dim:
+            raise ValueError(f"Expected queries of dim {self.dim}, got {queries.shape[1]}")
+        
+        if mode == 'ivf':
+            if self._centroids is None:
+                raise ValueError("IVF search needs build_ivf() first; use mode='exact' for a full scan")
+            scores, rows = self._search_ivf(queries, top_k, nprobe)
+        elif mode == 'exact':
+            scores, rows = self._search_exact(queries, top_k)
+        else:
+            raise ValueError(f"Unknown search mode: {mode}")
+        
+        order = np.argsort(-scores, axis=1)
+        results = []
+        for q in range(queries.shape[0]):
+            matches = []
+            for j in order[q]:
+                if rows[q, j] < 0 or not np.isfinite(scores[q, j]):
+                    continue
+                match = dict(self._metadata[rows[q, j]])
+                match['score'] = float(scores[q, j])
+                matches.append(match)
+            results.append(matches)
+        
+        return results[0] if single else results
+    
+    def flush(self):
+        """Write memmapped columns and the header to disk."""
+        self._embeddings.flush()
+        self._alive.flush()
+        self._assign.flush()
+        self._write_header()
+
+
+def demo_retrieval_index(index_dir="./ecg_index_demo", n=100000, dim=1152, queries=32):
+    """Build a synthetic index and time exact vs IVF search."""
+    rng = np.random.default_rng(0)
+    index = ECGEmbeddingIndex(index_dir, dim=dim)
+    
+    if len(index) < n:
+        print(f"Adding {n} synthetic embeddings (dim={dim})...")
+        diagnoses = ["Normal sinus rhythm", "Atrial fibrillation", "STEMI", "NSTEMI", "LBBB"]
+        start = time.perf_counter()
+        for offset in range(0, n, 10000):
+            batch = min(10000, n - offset)
+            index.add(
+                rng.standard_normal((batch, dim), dtype=np.float32),
+                [{'case_id': f"case-{offset + i}", 'diagnosis': diagnoses[(offset + i) % len(diagnoses)]}
+                 for i in range(batch)]
+            )
+        index.flush()
+        print(f"  Added in {time.perf_counter() - start:.2f}s")
+    
+    # Queries are perturbed copies of stored cases, so each should retrieve its source
+    noise = rng.standard_normal((queries, dim), dtype=np.float32) * (0.5 / np.sqrt(dim))
+    query_vectors = np.asarray(index._embeddings[:queries]) + noise
+    
+    start = time.perf_counter()
+    exact = index.search(query_vectors, top_k=5)
+    exact_ms = (time.perf_counter() - start) * 1000 / queries
+    print(f"Exact search: {exact_ms:.2f} ms/query over {len(index)} cases")
+    
+    start = time.perf_counter()
+    index.build_ivf()
+    print(f"IVF built in {time.perf_counter() - start:.2f}s")
+    
+    start = time.perf_counter()
+    approx = index.search(query_vectors, top_k=5, mode='ivf')
+    ivf_ms = (time.perf_counter() - start) * 1000 / queries
+    agreement = np.mean([a[0]['id'] == e[0]['id'] for a, e in zip(approx, exact)])
+    print(f"IVF search: {ivf_ms:.2f} ms/query, top-1 agreement with exact = {agreement:.3f}")
+    
+    print(f"\nTop match for query 0: {exact[0][0]}")
+    return index
+
+
+if __name__ == '__main__':
+    demo_retrieval_index()
@@ -1,8 +1,302 @@
-import pdfplumber
+"""
+Lab Report Text Extraction
+==========================
 
-with pdfplumber.open("sample_blood_report.pdf") as pdf:
-    full_text = ""
-    for page in pdf.pages:
-        full_text += page.extract_text() + "\n"
+Extracts page text from blood-report PDFs using the fastest installed
+backend that is good enough (see pdf_backends.py).
 
-print(full_text)
+Many PDFs (and the pages of long reports) are processed in a process pool,
+page text is streamed as a generator, and results are cached on disk keyed
+by the SHA-256 of the file contents (and the backend, when one is requested
+explicitly), so re-analyzing a session never re-parses a PDF that has
+already been seen. Each document is extracted with a single backend.
+A PDF that cannot be read does not stop the batch: every other document is
+still yielded (and cached), then ExtractionError reports the failures.
+
+Usage:
+    from extract_text import PDFTextExtractor
+    
+    extractor = PDFTextExtractor(cache_dir="./.pdf_text_cache", backend="auto")
+    texts = extractor.extract_many(["sample_blood_report.pdf", "blood_report_unbiased.pdf"])
+    
+    for path, page_number, text in extractor.iter_pages(paths):
+        ...
+    
+    python extract_text.py [report.pdf ...]
+"""
+
+import os
+import sys
+import json
+import hashlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import pdf_backends
+
+
+CACHE_VERSION = 3
+PAGES_PER_TASK = 8
+
+
+class ExtractionError(RuntimeError):
+    """Some PDFs of a batch could not be extracted; `failures` maps path -> exception."""
+    
+    def __init__(self, failures):
+        self.failures = failures
+        super().__init__(f"{len(failures)} PDF(s) could not be extracted: " +
+                         "; ".join(f"{path}: {error}" for path, error in failures.items()))
+
+
+def file_sha256(path, block_size=1 << 20):
+    """SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(digest, backend='auto'):
+    """Cache entry name: the content hash, plus the backend when one was requested explicitly."""
+    return digest if backend == 'auto' else f"{digest}.{backend}"
+
+
+def _read_cache(cache_dir, key):
+    """Cached page list for a cache key in cache_dir, or None."""
+    if cache_dir is None:
+        return None
+    try:
+        with open(os.path.join(cache_dir, f"{key}.json"), 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get('version') != CACHE_VERSION:
+        return None
+    return entry['pages']
+
+
+def _plan_document(task):
+    """
+    Process-pool worker: hash one PDF and look it up in the cache, or choose
+    its backend (extracting the first page range as the probe).
+    
+    Returns:
+        (digest, cached pages or None, backend, page count, probe pages)
+    """
+    path, backend, cache_dir, probe_pages, exclude = task
+    digest = file_sha256(path)
+    pages = _read_cache(cache_dir, cache_key(digest, backend))
+    if pages is not None:
+        return digest, pages, None, len(pages), pages
+    name, n_pages, probe = pdf_backends.choose_backend(path, backend, probe_pages, exclude)
+    return digest, None, name, n_pages, probe
+
+
+def _extract_page_range(task):
+    """Process-pool worker: text of pages [start, stop) of one PDF with its chosen backend."""
+    path, start, stop, backend = task
+    return pdf_backends.extract_pages(path, start, stop, backend, fallback=False)[1]
+
+
+class PDFTextExtractor:
+    """
+    Parallel, disk-cached page text extraction for many PDFs.
+    """
+    
+    def __init__(self, cache_dir=".pdf_text_cache", max_workers=None, pages_per_task=PAGES_PER_TASK,
+                 backend='auto'):
+        """
+        Args:
+            cache_dir: Directory for cached page text (None disables the cache)
+            max_workers: Process pool size (default: os.cpu_count())
+            pages_per_task: Pages extracted per worker task
+            backend: 'auto' (ranked order) or a pdf_backends name to try first
+        """
+        self.backend = backend
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.pages_per_task = pages_per_task
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+    
+    def _cache_path(self, digest):
+        return os.path.join(self.cache_dir, f"{cache_key(digest, self.backend)}.json")
+    
+    def load_cached(self, digest):
+        """Cached page list for a content hash and this extractor's backend, or None."""
+        return _read_cache(self.cache_dir, cache_key(digest, self.backend))
+    
+    def store_cached(self, digest, pages, backend):
+        """Write a page list, and the backend that produced it, to the cache (atomic rename)."""
+        if self.cache_dir is None:
+            return
+        path = self._cache_path(digest)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'backend': backend, 'requested': self.backend,
+                       'pages': pages}, f)
+        os.replace(tmp_path, path)
+    
+    def _iter_chunks(self, paths, whole_documents=False):
+        """
+        Extract PDFs in the process pool, yielding (path, pages, last) in input order.
+        
+        Hashing, cache lookup and backend choice run in the workers, a bounded
+        number of documents ahead of the consumer, and each document's
+        remaining page ranges are submitted as soon as it is planned. Every
+        range of a document uses the backend chosen for it; if that backend
+        fails on a later range, the whole document is re-extracted with the
+        next one. Pages are yielded per completed task (or per document with
+        whole_documents=True; streamed pages cannot be taken back, so after
+        a failure there the document is closed with an empty last chunk).
+        Documents are cached once all of their pages have been extracted.
+        
+        A document that cannot be hashed, opened or extracted by any backend
+        is skipped; the batch goes on and ExtractionError lists the failures
+        after the last document.
+        """
+        queued = iter(dict.fromkeys(paths))
+        lookahead = 2 * (self.max_workers or os.cpu_count() or 1)
+        planning = deque()    # (path, future of _plan_document) in input order
+        documents = deque()   # (path, digest, cached pages or None, backend, probe pages, range futures)
+        failures = {}         # path -> exception
+        
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            def plan(path, exclude=()):
+                task = (path, self.backend, None if exclude else self.cache_dir, self.pages_per_task, exclude)
+                return pool.submit(_plan_document, task)
+            
+            def submit_ranges(path, backend, n_pages):
+                return [
+                    pool.submit(_extract_page_range,
+                                (path, start, min(start + self.pages_per_task, n_pages), backend))
+                    for start in range(self.pages_per_task, n_pages, self.pages_per_task)
+                ]
+            
+            def top_up():
+                while len(planning) + len(documents) < lookahead:
+                    path = next(queued, None)
+                    if path is None:
+                        return
+                    planning.append((path, plan(path)))
+            
+            def schedule(block=False):
+                # Planned documents (in order) get their remaining page ranges submitted
+                while planning and (block or planning[0][1].done()):
+                    path, future = planning.popleft()
+                    block = False
+                    try:
+                        digest, cached, backend, n_pages, probe = future.result()
+                    except Exception as e:
+                        failures[path] = e
+                        continue
+                    futures = [] if cached is not None else submit_ranges(path, backend, n_pages)
+                    documents.append((path, digest, cached, backend, probe, futures))
+                top_up()
+            
+            def result(future):
+                # Keep planning later documents while waiting on this one
+                while not future.done():
+                    wait([future] + [f for _, f in planning], return_when=FIRST_COMPLETED)
+                    schedule()
+                return future.result()
+            
+            top_up()
+            while planning or documents:
+                schedule(block=not documents)
+                if not documents:
+                    continue   # the documents planned so far failed
+                path, digest, cached, backend, probe, futures = documents.popleft()
+                if cached is not None:
+                    yield path, cached, True
+                    continue
+                
+                tried = []
+                streamed = not whole_documents
+                try:
+                    while True:
+                        tried.append(backend)
+                        pages = list(probe)
+                        if streamed:
+                            yield path, probe, not futures
+                        try:
+                            for number, future in enumerate(futures, start=1):
+                                task_pages = result(future)
+                                pages.extend(task_pages)
+                                if streamed:
+                                    yield path, task_pages, number == len(futures)
+                            break
+                        except Exception as e:
+                            for future in futures:
+                                future.cancel()
+                            if streamed:
+                                raise RuntimeError(f"{backend} failed after the first pages "
+                                                   f"were yielded: {e}") from e
+                            # Fail over the whole document, so its pages share one backend
+                            _, _, backend, n_pages, probe = result(plan(path, tuple(tried)))
+                            futures = submit_ranges(path, backend, n_pages)
+                except Exception as e:
+                    failures[path] = e
+                    if streamed:
+                        yield path, [], True
+                    continue
+                
+                self.store_cached(digest, pages, backend)
+                if whole_documents:
+                    yield path, pages, True
+        
+        if failures:
+            raise ExtractionError(failures)
+    
+    def iter_documents(self, paths):
+        """
+        Yield (path, pages) per distinct PDF in input order, extracting
+        uncached PDFs in the process pool and caching them as they complete.
+        
+        Raises:
+            ExtractionError: After the last document, if any PDF could not be
+                extracted (all others have been yielded)
+        """
+        for path, pages, _ in self._iter_chunks(paths, whole_documents=True):
+            yield path, pages
+    
+    def iter_pages(self, paths):
+        """
+        Yield (path, page_number, text) for every page, 1-based page numbers.
+        
+        Pages are streamed as each page-range task completes, not per document.
+        
+        Raises:
+            ExtractionError: After the last page, if any PDF could not be
+                extracted (one that failed part-way may have yielded some pages)
+        """
+        page_number = 0
+        for path, pages, last in self._iter_chunks(paths):
+            for text in pages:
+                page_number += 1
+                yield path, page_number, text
+            if last:
+                page_number = 0
+    
+    def extract_many(self, paths):
+        """Full text of each PDF, as {path: text}."""
+        return {path: "\n".join(pages) for path, pages in self.iter_documents(paths)}
+    
+    def extract(self, path):
+        """Full text of one PDF."""
+        return self.extract_many([path])[path]
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or ["sample_blood_report.pdf"]
+    extractor = PDFTextExtractor()
+    try:
+        for path, pages in extractor.iter_documents(paths):
+            if len(paths) > 1:
+                print(f"===== {path} =====")
+            print("\n".join(pages))
+    except ExtractionError as e:
+        for path, error in e.failures.items():
+            print(f"{path}: {error}", file=sys.stderr)
+        sys.exit(1)
@@ -1,6 +1,13 @@
+from string import Template
+from html import escape
 from xhtml2pdf import pisa
 
+from generate_report_pdf_v2 import SAMPLE_RECORD as _V2_RECORD
+
 def convert_html_to_pdf(source_html, output_filename):
+    """Render HTML to PDF. output_filename may be a path or a writable binary file object."""
+    if hasattr(output_filename, "write"):
+        return pisa.CreatePDF(source_html, dest=output_filename).err
     result_file = open(output_filename, "w+b")
     pisa_status = pisa.CreatePDF(
             source_html,                # the HTML to convert
@@ -8,7 +15,19 @@ def convert_html_to_pdf(source_html, output_filename):
     result_file.close()
     return pisa_status.err
 
-html_content = """
+SAMPLE_RECORD = dict(
+    _V2_RECORD,
+    patient=dict(_V2_RECORD["patient"], clinical_history="Acute Chest Pain; Suspected Anterolateral STEMI"),
+    interpretation=[
+        "Biomarker profile consistent with Acute Myocardial Infarction (Anterolateral STEMI).",
+        "Markedly elevated High-Sensitivity Troponin I and CK-MB indicate significant myocardial necrosis.",
+        "Elevated WBC count suggests acute stress response/inflammation.",
+    ],
+    recommendation="Immediate cardiological intervention (Angiography/PCI) is recommended.",
+)
+
+# Templates are compiled once at import (i.e. once per worker process)
+PAGE_TEMPLATE = Template("""
 <!DOCTYPE html>
 <html>
 <head>
@@ -40,155 +59,106 @@ html_content = """
 
 <table class="meta-table">
     <tr>
-        <td><strong>Patient Name:</strong> Rajesh Kumar</td>
-        <td><strong>Report Date:</strong> 15-Dec-2025</td>
+        <td><strong>Patient Name:</strong> $name</td>
+        <td><strong>Report Date:</strong> $report_date</td>
     </tr>
     <tr>
-        <td><strong>Age/Gender:</strong> 58 years / Male</td>
-        <td><strong>Report ID:</strong> BLR-2024-4521</td>
+        <td><strong>Age/Gender:</strong> $age years / $gender</td>
+        <td><strong>Report ID:</strong> $report_id</td>
     </tr>
     <tr>
-        <td><strong>Referred By:</strong> Dr. Ananya Sharma</td>
-        <td><strong>Collection Time:</strong> 08:30 AM</td>
+        <td><strong>Referred By:</strong> $referred_by</td>
+        <td><strong>Collection Time:</strong> $collection_time</td>
     </tr>
     <tr>
-        <td><strong>Clinical History:</strong> Acute Chest Pain; Suspected Anterolateral STEMI</td>
-        <td><strong>Sample Type:</strong> Venous Blood</td>
+        <td><strong>Clinical History:</strong> $clinical_history</td>
+        <td><strong>Sample Type:</strong> $sample_type</td>
     </tr>
 </table>
+$sections
+<br><br>
+$interpretation
+<div class="footer">
+    <table style="border: none;">
+        <tr>
+            <td style="border: none;"><strong>Lab Technician:</strong> NABL Certified Lab</td>
+            <td style="border: none; text-align: right;"><strong>Consultant Pathologist:</strong> $pathologist</td>
+        </tr>
+    </table>
+    <br>
+    Report Generated: $generated | This is a computer-generated report.
+</div>
 
-<div class="section-header">CARDIAC BIOMARKERS (CRITICAL)</div>
-<table>
-    <tr>
-        <th>Test</th>
-        <th>Result</th>
-        <th>Unit</th>
-        <th>Reference Range</th>
-        <th>Status</th>
-    </tr>
-    <tr class="highlight">
-        <td class="critical">🥇 1️⃣ Cardiac Troponin I (High Sensitivity)</td>
-        <td class="critical">52.480</td>
-        <td class="critical">ng/mL</td>
-        <td class="critical">&lt; 0.04</td>
-        <td class="critical">CRITICAL HIGH</td>
-    </tr>
-    <tr>
-        <td>CK-MB</td>
-        <td>145.0</td>
-        <td>U/L</td>
-        <td>&lt; 25</td>
-        <td>HIGH</td>
-    </tr>
-    <tr>
-        <td>NT-proBNP</td>
-        <td>1250</td>
-        <td>pg/mL</td>
-        <td>&lt; 125</td>
-        <td>HIGH</td>
-    </tr>
-    <tr>
-        <td>BNP</td>
-        <td>890</td>
-        <td>pg/mL</td>
-        <td>&lt; 100</td>
-        <td>HIGH</td>
-    </tr>
-    <tr>
-        <td>Myoglobin</td>
-        <td>450</td>
-        <td>ng/mL</td>
-        <td>&lt; 70</td>
-        <td>HIGH</td>
-    </tr>
-    <tr>
-        <td>hs-CRP</td>
-        <td>12.4</td>
-        <td>mg/L</td>
-        <td>&lt; 3.0</td>
-        <td>HIGH</td>
-    </tr>
-</table>
+</body>
+</html>
+""")
 
-<div class="section-header">COMPLETE BLOOD COUNT (CBC)</div>
+SECTION_TEMPLATE = Template("""
+<div class="section-header">$title</div>
 <table>
     <tr>
         <th>Test</th>
         <th>Result</th>
         <th>Unit</th>
-        <th>Reference Range</th>
-    </tr>
-    <tr>
-        <td>Hemoglobin</td>
-        <td>13.2</td>
-        <td>g/dL</td>
-        <td>13.5 - 17.5</td>
-    </tr>
-    <tr>
-        <td>WBC Count</td>
-        <td>14,500</td>
-        <td>/uL</td>
-        <td>4,000 - 11,000</td>
-    </tr>
-    <tr>
-        <td>Platelet Count</td>
-        <td>285,000</td>
-        <td>/uL</td>
-        <td>150,000 - 400,000</td>
+        <th>Reference Range</th>$status_header
     </tr>
+$rows
 </table>
+""")
 
-<div class="section-header">ELECTROLYTES & RENAL FUNCTION</div>
-<table>
-    <tr>
-        <th>Test</th>
-        <th>Result</th>
-        <th>Unit</th>
-        <th>Reference Range</th>
-    </tr>
-    <tr>
-        <td>Potassium (K+)</td>
-        <td>4.2</td>
-        <td>mEq/L</td>
-        <td>3.5 - 5.0</td>
-    </tr>
-    <tr>
-        <td>Sodium (Na+)</td>
-        <td>138</td>
-        <td>mEq/L</td>
-        <td>136 - 145</td>
-    </tr>
-    <tr>
-        <td>Creatinine</td>
-        <td>1.1</td>
-        <td>mg/dL</td>
-        <td>0.7 - 1.3</td>
-    </tr>
-</table>
+ROW_TEMPLATE = Template("""    <tr$row_class>
+        <td$cell_class>$test</td>
+        <td$cell_class>$result</td>
+        <td$cell_class>$unit</td>
+        <td$cell_class>$range</td>$status_cell
+    </tr>""")
 
-<br><br>
-<div style="border: 2px solid #cc0000; padding: 10px; background-color: #fff0f0;">
+INTERPRETATION_TEMPLATE = Template("""<div style="border: 2px solid #cc0000; padding: 10px; background-color: #fff0f0;">
     <strong>Interpretation:</strong><br>
-    Biomarker profile consistent with <strong>Acute Myocardial Infarction (Anterolateral STEMI)</strong>.<br>
-    Markedly elevated High-Sensitivity Troponin I and CK-MB indicate significant myocardial necrosis.<br>
-    Elevated WBC count suggests acute stress response/inflammation.<br>
-    <strong>Immediate cardiological intervention (Angiography/PCI) is recommended.</strong>
+    $lines
 </div>
+""")
 
-<div class="footer">
-    <table style="border: none;">
-        <tr>
-            <td style="border: none;"><strong>Lab Technician:</strong> NABL Certified Lab</td>
-            <td style="border: none; text-align: right;"><strong>Consultant Pathologist:</strong> Dr. Priya Mehta, MD</td>
-        </tr>
-    </table>
-    <br>
-    Report Generated: 15-Dec-2025 14:01 | This is a computer-generated report.
-</div>
+def render_section(section):
+    status = bool(section.get("status_column"))
+    rows = []
+    for row in section["rows"]:
+        critical = bool(row.get("critical"))
+        cell_class = ' class="critical"' if critical else ""
+        rows.append(ROW_TEMPLATE.substitute(
+            row_class=' class="highlight"' if critical else "",
+            cell_class=cell_class,
+            test=escape(row["test"]),
+            result=escape(row["result"]),
+            unit=escape(row["unit"]),
+            range=escape(row["range"]),
+            status_cell=f"\n        <td{cell_class}>{escape(row.get('status', ''))}</td>" if status else "",
+        ))
+    return SECTION_TEMPLATE.substitute(
+        title=escape(section["title"]),
+        status_header="\n        <th>Status</th>" if status else "",
+        rows="\n".join(rows),
+    )
 
-</body>
-</html>
-"""
+def render_html(record):
+    """Fill the compiled template with one patient/lab record."""
+    patient = record["patient"]
+    lines = [escape(line) + "<br>" for line in record.get("interpretation", [])]
+    if record.get("recommendation"):
+        lines.append(f"<strong>{escape(record['recommendation'])}</strong>")
+    interpretation = INTERPRETATION_TEMPLATE.substitute(lines="\n    ".join(lines)) if lines else ""
+    return PAGE_TEMPLATE.substitute(
+        {key: escape(str(value)) for key, value in patient.items()},
+        sections="".join(render_section(section) for section in record["sections"]),
+        interpretation=interpretation,
+        pathologist=escape(record["pathologist"]),
+        generated=escape(record["generated"]),
+    )
+
+def create_report(filename, record=SAMPLE_RECORD):
+    """Render one report to a path or binary file object; returns the pisa error count."""
+    return convert_html_to_pdf(render_html(record), filename)
 
-convert_html_to_pdf(html_content, "anterolateral_stemi_report.pdf")
-print("PDF generated successfully: anterolateral_stemi_report.pdf")
+if __name__ == "__main__":
+    create_report("anterolateral_stemi_report.pdf")
+    print("PDF generated successfully: anterolateral_stemi_report.pdf")
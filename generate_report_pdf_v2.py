@@ -3,12 +3,67 @@ from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from xml.sax.saxutils import escape
 
-def create_report(filename):
-    doc = SimpleDocTemplate(filename, pagesize=A4)
-    elements = []
-    
+# Default patient/lab record (see report_engine.py for the JSON Lines format)
+SAMPLE_RECORD = {
+    "patient": {
+        "name": "Rajesh Kumar",
+        "age": 58,
+        "gender": "Male",
+        "report_id": "BLR-2024-4521",
+        "report_date": "15-Dec-2025",
+        "referred_by": "Dr. Ananya Sharma",
+        "collection_time": "08:30 AM",
+        "clinical_history": "Acute Chest Pain; Shortness of Breath",
+        "sample_type": "Venous Blood",
+    },
+    "sections": [
+        {
+            "title": "CARDIAC BIOMARKERS (CRITICAL)",
+            "status_column": True,
+            "rows": [
+                {"test": "🥇 1️⃣ Cardiac Troponin I (High Sensitivity)", "result": "52.480", "unit": "ng/mL",
+                 "range": "< 0.04", "status": "CRITICAL HIGH", "critical": True},
+                {"test": "CK-MB", "result": "145.0", "unit": "U/L", "range": "< 25", "status": "HIGH"},
+                {"test": "NT-proBNP", "result": "1250", "unit": "pg/mL", "range": "< 125", "status": "HIGH"},
+                {"test": "BNP", "result": "890", "unit": "pg/mL", "range": "< 100", "status": "HIGH"},
+                {"test": "Myoglobin", "result": "450", "unit": "ng/mL", "range": "< 70", "status": "HIGH"},
+                {"test": "hs-CRP", "result": "12.4", "unit": "mg/L", "range": "< 3.0", "status": "HIGH"},
+            ],
+        },
+        {
+            "title": "COMPLETE BLOOD COUNT (CBC)",
+            "rows": [
+                {"test": "Hemoglobin", "result": "13.2", "unit": "g/dL", "range": "13.5 - 17.5"},
+                {"test": "WBC Count", "result": "14,500", "unit": "/uL", "range": "4,000 - 11,000"},
+                {"test": "Platelet Count", "result": "285,000", "unit": "/uL", "range": "150,000 - 400,000"},
+            ],
+        },
+        {
+            "title": "ELECTROLYTES & RENAL FUNCTION",
+            "rows": [
+                {"test": "Potassium (K+)", "result": "4.2", "unit": "mEq/L", "range": "3.5 - 5.0"},
+                {"test": "Sodium (Na+)", "result": "138", "unit": "mEq/L", "range": "136 - 145"},
+                {"test": "Creatinine", "result": "1.1", "unit": "mg/dL", "range": "0.7 - 1.3"},
+            ],
+        },
+    ],
+    "interpretation": [
+        "Biomarker profile shows critically elevated parameters.",
+        "Markedly elevated High-Sensitivity Troponin I (52.48 ng/mL) and CK-MB indicate significant myocardial necrosis.",
+        "Elevated WBC count suggests acute stress response/inflammation.",
+    ],
+    "recommendation": "Immediate cardiological intervention and ECG correlation are recommended to determine the exact etiology.",
+    "pathologist": "Dr. Priya Mehta, MD",
+    "generated": "15-Dec-2025 14:01",
+}
+
+
+def build_styles():
+    """Paragraph and table styles for the report layout (build once, reuse for every report)."""
     styles = getSampleStyleSheet()
+    normal_style = styles['Normal']
     
     # Custom Styles
     title_style = ParagraphStyle(
@@ -27,7 +82,6 @@ def create_report(filename):
         textColor=colors.black,
         spaceAfter=20
     )
-    normal_style = styles['Normal']
     section_style = ParagraphStyle(
         'Section',
         parent=styles['Heading3'],
@@ -40,120 +94,132 @@ def create_report(filename):
         leftIndent=5,
         firstLineIndent=0
     )
+    interp_style = ParagraphStyle(
+        'Interp',
+        parent=styles['Normal'],
+        borderColor=colors.red,
+        borderWidth=2,
+        backColor=colors.mistyrose,
+        borderPadding=10,
+        spaceBefore=20
+    )
+    
+    return {
+        'title': title_style,
+        'subtitle': subtitle_style,
+        'normal': normal_style,
+        'address': ParagraphStyle('Addr', parent=normal_style, alignment=TA_CENTER),
+        'section': section_style,
+        'interp': interp_style,
+        'footer': ParagraphStyle('Footer', parent=styles['Normal'], fontSize=9),
+        'meta_table': TableStyle([
+            ('FONTNAME', (0,0), (-1,-1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0,0), (-1,-1), 10),
+            ('BOTTOMPADDING', (0,0), (-1,-1), 5),
+        ]),
+        'status_table': TableStyle([
+            ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
+            ('TEXTCOLOR', (0,0), (-1,0), colors.black),
+            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
+            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+            ('BOTTOMPADDING', (0,0), (-1,0), 6),
+            ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
+        ]),
+        'plain_table': TableStyle([
+            ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
+            ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
+        ]),
+    }
+
+
+def _critical_row_style(row):
+    # Highlight Critical Row
+    return [
+        ('BACKGROUND', (0,row), (-1,row), colors.yellow),
+        ('TEXTCOLOR', (0,row), (-1,row), colors.red),
+        ('FONTNAME', (0,row), (-1,row), 'Helvetica-Bold'),
+    ]
+
+
+def build_elements(record, styles):
+    """Flowables for one patient/lab record."""
+    patient = record["patient"]
+    elements = []
     
     # Header
-    elements.append(Paragraph("CARDIOCARE MEDICAL CENTER", title_style))
-    elements.append(Paragraph("Department of Clinical Pathology", subtitle_style))
-    elements.append(Paragraph("123 Medical Drive, Healthcare City | Phone: +91 9876543210", 
-                              ParagraphStyle('Addr', parent=normal_style, alignment=TA_CENTER)))
+    elements.append(Paragraph("CARDIOCARE MEDICAL CENTER", styles['title']))
+    elements.append(Paragraph("Department of Clinical Pathology", styles['subtitle']))
+    elements.append(Paragraph("123 Medical Drive, Healthcare City | Phone: +91 9876543210", styles['address']))
     elements.append(Spacer(1, 20))
-    elements.append(Paragraph("COMPREHENSIVE BLOOD INVESTIGATION REPORT", subtitle_style))
+    elements.append(Paragraph("COMPREHENSIVE BLOOD INVESTIGATION REPORT", styles['subtitle']))
     elements.append(Spacer(1, 10))
-
+    
     # Patient Info Meta Table
     meta_data = [
-        ["Patient Name: Rajesh Kumar", "Report Date: 15-Dec-2025"],
-        ["Age/Gender: 58 years / Male", "Report ID: BLR-2024-4521"],
-        ["Referred By: Dr. Ananya Sharma", "Collection Time: 08:30 AM"],
-        ["Clinical History: Acute Chest Pain; Shortness of Breath", "Sample Type: Venous Blood"]
+        [f"Patient Name: {patient['name']}", f"Report Date: {patient['report_date']}"],
+        [f"Age/Gender: {patient['age']} years / {patient['gender']}", f"Report ID: {patient['report_id']}"],
+        [f"Referred By: {patient['referred_by']}", f"Collection Time: {patient['collection_time']}"],
+        [f"Clinical History: {patient['clinical_history']}", f"Sample Type: {patient['sample_type']}"]
     ]
     meta_table = Table(meta_data, colWidths=[250, 200])
-    meta_table.setStyle(TableStyle([
-        ('FONTNAME', (0,0), (-1,-1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0,0), (-1,-1), 10),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 5),
-    ]))
+    meta_table.setStyle(styles['meta_table'])
     elements.append(meta_table)
     elements.append(Spacer(1, 20))
-
-    # Cardiac Biomarkers Section
-    elements.append(Paragraph("CARDIAC BIOMARKERS (CRITICAL)", section_style))
-    
-    biomarker_data = [
-        ["Test", "Result", "Unit", "Reference Range", "Status"],
-        ["🥇 1️⃣ Cardiac Troponin I (High Sensitivity)", "52.480", "ng/mL", "< 0.04", "CRITICAL HIGH"],
-        ["CK-MB", "145.0", "U/L", "< 25", "HIGH"],
-        ["NT-proBNP", "1250", "pg/mL", "< 125", "HIGH"],
-        ["BNP", "890", "pg/mL", "< 100", "HIGH"],
-        ["Myoglobin", "450", "ng/mL", "< 70", "HIGH"],
-        ["hs-CRP", "12.4", "mg/L", "< 3.0", "HIGH"]
-    ]
-    
-    biomarker_table = Table(biomarker_data, colWidths=[200, 60, 60, 80, 100])
-    biomarker_table.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
-        ('TEXTCOLOR', (0,0), (-1,0), colors.black),
-        ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0,0), (-1,0), 6),
-        # Highlight Critical Row for Troponin
-        ('BACKGROUND', (0,1), (-1,1), colors.yellow),
-        ('TEXTCOLOR', (0,1), (-1,1), colors.red),
-        ('FONTNAME', (0,1), (-1,1), 'Helvetica-Bold'),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-    ]))
-    elements.append(biomarker_table)
-    elements.append(Spacer(1, 20))
-    
-    # CBC Section
-    elements.append(Paragraph("COMPLETE BLOOD COUNT (CBC)", section_style))
-    cbc_data = [
-        ["Test", "Result", "Unit", "Reference Range"],
-        ["Hemoglobin", "13.2", "g/dL", "13.5 - 17.5"],
-        ["WBC Count", "14,500", "/uL", "4,000 - 11,000"],
-        ["Platelet Count", "285,000", "/uL", "150,000 - 400,000"]
-    ]
-    cbc_table = Table(cbc_data, colWidths=[200, 60, 60, 180])
-    cbc_table.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-    ]))
-    elements.append(cbc_table)
-    elements.append(Spacer(1, 20))
     
-    # Electrolytes Section
-    elements.append(Paragraph("ELECTROLYTES & RENAL FUNCTION", section_style))
-    elec_data = [
-        ["Test", "Result", "Unit", "Reference Range"],
-        ["Potassium (K+)", "4.2", "mEq/L", "3.5 - 5.0"],
-        ["Sodium (Na+)", "138", "mEq/L", "136 - 145"],
-        ["Creatinine", "1.1", "mg/dL", "0.7 - 1.3"]
-    ]
-    elec_table = Table(elec_data, colWidths=[200, 60, 60, 180])
-    elec_table.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-    ]))
-    elements.append(elec_table)
-    elements.append(Spacer(1, 20))
+    # Lab Sections
+    for section in record["sections"]:
+        elements.append(Paragraph(escape(section["title"]), styles['section']))
+        
+        if section.get("status_column"):
+            data = [["Test", "Result", "Unit", "Reference Range", "Status"]]
+            data += [[r["test"], r["result"], r["unit"], r["range"], r.get("status", "")] for r in section["rows"]]
+            table = Table(data, colWidths=[200, 60, 60, 80, 100])
+            base_style = styles['status_table']
+        else:
+            data = [["Test", "Result", "Unit", "Reference Range"]]
+            data += [[r["test"], r["result"], r["unit"], r["range"]] for r in section["rows"]]
+            table = Table(data, colWidths=[200, 60, 60, 180])
+            base_style = styles['plain_table']
+        
+        table.setStyle(base_style)
+        highlights = []
+        for i, row in enumerate(section["rows"], start=1):
+            if row.get("critical"):
+                highlights += _critical_row_style(i)
+        if highlights:
+            table.setStyle(TableStyle(highlights))
+        elements.append(table)
+        elements.append(Spacer(1, 20))
     
     # Interpretation Box
-    interp_style = ParagraphStyle(
-        'Interp',
-        parent=styles['Normal'],
-        borderColor=colors.red,
-        borderWidth=2,
-        backColor=colors.mistyrose,
-        borderPadding=10,
-        spaceBefore=20
-    )
-    elements.append(Paragraph(
-        "<b>Interpretation:</b><br/>"
-        "Biomarker profile shows critically elevated parameters.<br/>"
-        "Markedly elevated High-Sensitivity Troponin I (52.48 ng/mL) and CK-MB indicate significant myocardial necrosis.<br/>"
-        "Elevated WBC count suggests acute stress response/inflammation.<br/>"
-        "<b>Immediate cardiological intervention and ECG correlation are recommended to determine the exact etiology.</b>",
-        interp_style
-    ))
+    interpretation = "<br/>".join(escape(line) for line in record.get("interpretation", []))
+    if record.get("recommendation"):
+        interpretation += f"<br/><b>{escape(record['recommendation'])}</b>"
+    if interpretation:
+        elements.append(Paragraph("<b>Interpretation:</b><br/>" + interpretation, styles['interp']))
     
     # Footer
     elements.append(Spacer(1, 40))
-    footer_style = ParagraphStyle('Footer', parent=styles['Normal'], fontSize=9)
-    elements.append(Paragraph("<b>Lab Technician:</b> NABL Certified Lab &nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp; <b>Consultant Pathologist:</b> Dr. Priya Mehta, MD", footer_style))
-    elements.append(Paragraph("Report Generated: 15-Dec-2025 14:01 | This is a computer-generated report.", footer_style))
+    gap = "&nbsp;" * 40
+    elements.append(Paragraph(f"<b>Lab Technician:</b> NABL Certified Lab {gap} <b>Consultant Pathologist:</b> {escape(record['pathologist'])}", styles['footer']))
+    elements.append(Paragraph(f"Report Generated: {escape(record['generated'])} | This is a computer-generated report.", styles['footer']))
+    
+    return elements
+
 
+def create_report(filename, record=SAMPLE_RECORD, styles=None):
+    """
+    Render one report.
+    
+    filename may be a path or a writable binary file object (e.g. io.BytesIO);
+    pass prebuilt styles from build_styles() when rendering many reports.
+    """
+    if styles is None:
+        styles = build_styles()
+    doc = SimpleDocTemplate(filename, pagesize=A4)
+    
     # Build PDF
-    doc.build(elements)
+    doc.build(build_elements(record, styles))
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,523 @@
+"""
+Structured Lab Report Parser
+============================
+
+Turns the Test / Result / Unit / Reference Range tables of blood-report
+PDFs into typed results, with units normalized per analyte and
+high/low/critical flags computed against the parsed reference ranges.
+
+Text comes from extract_text.PDFTextExtractor (so parsing reuses its page
+cache). Rows are recognized inside each table (from its "Test Result Unit
+Reference Range" header to the next section) and matched to analytes
+through a precompiled alias index, so critical values can be put straight
+into the prompt without embedding the whole report.
+
+Usage:
+    from lab_parser import parse_report, format_for_prompt
+    
+    report = parse_report("sample_blood_report.pdf")
+    report["results"]   # list of typed lab results (JSON-serializable)
+    report["critical"]  # subset flagged critical
+    
+    python lab_parser.py report.pdf [report2.pdf ...]   # prints JSON
+"""
+
+import re
+import sys
+import json
+from dataclasses import dataclass, field, asdict
+from typing import Optional
+
+
+@dataclass
+class Analyte:
+    """Canonical analyte definition used for alias lookup and unit normalization."""
+    key: str
+    name: str
+    unit: str
+    aliases: tuple
+    conversions: dict = field(default_factory=dict)  # unit -> factor to canonical unit
+    critical_low: Optional[float] = None  # in canonical unit
+    critical_high: Optional[float] = None
+
+
+@dataclass
+class LabResult:
+    """One parsed table row."""
+    analyte: Optional[str]  # Analyte.key, None if the test name is unknown
+    name: str               # canonical name (raw test name when unknown)
+    value: float
+    unit: str
+    ref_low: Optional[float]
+    ref_high: Optional[float]
+    flag: Optional[str]     # 'H', 'L', 'N' or None without a usable range
+    critical: bool
+    unit_normalized: bool   # value/unit/range converted to the canonical unit
+    raw_name: str
+    raw_value: str
+    raw_unit: str
+    raw_range: str
+    status: Optional[str]   # status column as printed on the report
+    section: Optional[str]
+    page: int
+
+
+ANALYTES = [
+    # Cardiac biomarkers
+    Analyte('troponin_i', 'Troponin I', 'ng/mL',
+            ('troponin i', 'trop i', 'tni', 'ctni', 'hs tni', 'hs ctni', 'hs troponin i'),
+            {'ng/l': 0.001, 'pg/ml': 0.001, 'ug/l': 1.0}, critical_high=0.4),
+    Analyte('troponin_t', 'Troponin T', 'ng/mL',
+            ('troponin t', 'trop t', 'tnt', 'ctnt', 'hs tnt', 'hs ctnt', 'hs troponin t'),
+            {'ng/l': 0.001, 'pg/ml': 0.001, 'ug/l': 1.0}, critical_high=0.1),
+    Analyte('ck_mb', 'CK-MB', 'U/L', ('ck mb', 'ckmb', 'creatine kinase mb', 'cpk mb')),
+    Analyte('nt_probnp', 'NT-proBNP', 'pg/mL', ('nt probnp', 'ntprobnp', 'nt pro bnp'),
+            {'ng/l': 1.0}),
+    Analyte('bnp', 'BNP', 'pg/mL', ('bnp', 'b type natriuretic peptide', 'brain natriuretic peptide'),
+            {'ng/l': 1.0}),
+    Analyte('myoglobin', 'Myoglobin', 'ng/mL', ('myoglobin',), {'ug/l': 1.0}),
+    Analyte('hs_crp', 'hs-CRP', 'mg/L', ('hs crp', 'hscrp', 'crp', 'c reactive protein'),
+            {'mg/dl': 10.0}),
+    Analyte('d_dimer', 'D-Dimer', 'ug/mL FEU', ('d dimer', 'ddimer'),
+            {'ug/ml': 1.0, 'mg/l': 1.0, 'mg/lfeu': 1.0, 'ng/mlfeu': 0.001, 'ng/ml': 0.001}),
+    # Complete blood count
+    Analyte('hemoglobin', 'Hemoglobin', 'g/dL', ('hemoglobin', 'haemoglobin', 'hb', 'hgb'),
+            {'g/l': 0.1}, critical_low=7.0, critical_high=20.0),
+    Analyte('rbc', 'RBC Count', 'million/uL', ('rbc', 'rbc count', 'red blood cell count', 'erythrocytes'),
+            {'10^6/ul': 1.0, 'x10^6/ul': 1.0, '10^12/l': 1.0, 'x10^12/l': 1.0}),
+    Analyte('wbc', 'WBC Count', '/uL', ('wbc', 'wbc count', 'white blood cell count', 'tlc', 'leukocytes'),
+            {'cells/ul': 1.0, '/mm3': 1.0, '10^3/ul': 1000.0, 'x10^3/ul': 1000.0,
+             '10^9/l': 1000.0, 'x10^9/l': 1000.0},
+            critical_low=2000.0, critical_high=30000.0),
+    Analyte('platelets', 'Platelet Count', '/uL', ('platelet count', 'platelets', 'plt'),
+            {'cells/ul': 1.0, '/mm3': 1.0, '10^3/ul': 1000.0, 'x10^3/ul': 1000.0,
+             '10^9/l': 1000.0, 'x10^9/l': 1000.0, 'lakhs/ul': 100000.0},
+            critical_low=50000.0, critical_high=1000000.0),
+    Analyte('hematocrit', 'Hematocrit', '%', ('hematocrit', 'haematocrit', 'pcv', 'hct'),
+            {'l/l': 100.0}),
+    Analyte('mcv', 'MCV', 'fL', ('mcv',)),
+    Analyte('mch', 'MCH', 'pg', ('mch',)),
+    Analyte('mchc', 'MCHC', 'g/dL', ('mchc',), {'g/l': 0.1}),
+    # Thyroid
+    Analyte('tsh', 'TSH', 'uIU/mL', ('tsh', 'thyroid stimulating hormone'), {'miu/l': 1.0}),
+    Analyte('ft4', 'Free T4', 'ng/dL', ('free t4', 'ft4'), {'pmol/l': 1 / 12.87}),
+    Analyte('ft3', 'Free T3', 'pg/mL', ('free t3', 'ft3'), {'pmol/l': 0.651}),
+    # Electrolytes and renal function
+    Analyte('potassium', 'Potassium', 'mEq/L', ('potassium', 'k+', 'serum potassium'),
+            {'mmol/l': 1.0}, critical_low=2.5, critical_high=6.0),
+    Analyte('sodium', 'Sodium', 'mEq/L', ('sodium', 'na+', 'serum sodium'),
+            {'mmol/l': 1.0}, critical_low=120.0, critical_high=160.0),
+    Analyte('chloride', 'Chloride', 'mEq/L', ('chloride', 'cl'), {'mmol/l': 1.0}),
+    Analyte('magnesium', 'Magnesium', 'mg/dL', ('magnesium', 'mg++', 'mg2+'),
+            {'mmol/l': 2.43, 'meq/l': 1.215}, critical_low=1.0, critical_high=4.7),
+    Analyte('calcium', 'Calcium', 'mg/dL', ('calcium', 'calcium total', 'total calcium'),
+            {'mmol/l': 4.008}, critical_low=6.0, critical_high=13.0),
+    Analyte('creatinine', 'Creatinine', 'mg/dL', ('creatinine', 'serum creatinine'),
+            {'umol/l': 1 / 88.42}),
+    Analyte('bun', 'BUN', 'mg/dL', ('bun', 'blood urea nitrogen'), {'mmol/l': 2.8}),
+    Analyte('egfr', 'eGFR', 'mL/min/1.73m2', ('egfr',), {'ml/min/1.73m^2': 1.0, 'ml/min': 1.0}),
+    # Coagulation
+    Analyte('pt', 'Prothrombin Time', 'seconds', ('pt', 'prothrombin time'), {'sec': 1.0, 's': 1.0}),
+    Analyte('inr', 'INR', 'ratio', ('inr',), {'': 1.0}, critical_high=5.0),
+    Analyte('aptt', 'aPTT', 'seconds', ('aptt', 'ptt', 'activated partial thromboplastin time'),
+            {'sec': 1.0, 's': 1.0}, critical_high=100.0),
+    Analyte('fibrinogen', 'Fibrinogen', 'mg/dL', ('fibrinogen',), {'g/l': 100.0}),
+    # Metabolic
+    Analyte('glucose', 'Glucose', 'mg/dL',
+            ('glucose', 'blood glucose', 'fasting blood sugar', 'fbs', 'random blood sugar', 'rbs'),
+            {'mmol/l': 18.016}, critical_low=40.0, critical_high=500.0),
+    Analyte('hba1c', 'HbA1c', '%', ('hba1c', 'glycated hemoglobin')),
+    Analyte('cholesterol_total', 'Total Cholesterol', 'mg/dL', ('total cholesterol', 'cholesterol'),
+            {'mmol/l': 38.67}),
+    Analyte('ldl', 'LDL Cholesterol', 'mg/dL', ('ldl', 'ldl cholesterol'), {'mmol/l': 38.67}),
+    Analyte('hdl', 'HDL Cholesterol', 'mg/dL', ('hdl', 'hdl cholesterol'), {'mmol/l': 38.67}),
+    Analyte('triglycerides', 'Triglycerides', 'mg/dL', ('triglycerides', 'tg'), {'mmol/l': 88.57}),
+]
+
+
+def normalize_name(text):
+    """Lowercase a test name and reduce it to alphanumerics, '+' and single spaces."""
+    return " ".join(re.sub(r"[^a-z0-9+]+", " ", text.lower()).split())
+
+
+def normalize_unit(text):
+    """Canonical spelling of a unit for lookup ('µg/mL' -> 'ug/ml', 'x 10³/µL' -> 'x10^3/ul')."""
+    unit = text.replace("µ", "u").replace("μ", "u").replace("³", "^3").replace("⁹", "^9")
+    unit = unit.replace("²", "2").lower().replace(" ", "")
+    return unit.replace("mcg", "ug").replace("mm^3", "mm3")
+
+
+# Precompiled alias index: exact normalized-name lookup, then a single
+# longest-first alternation for names with extra words ("Cardiac Troponin I (hs)")
+_ALIAS_INDEX = {}
+for _analyte in ANALYTES:
+    for _alias in (_analyte.name,) + _analyte.aliases:
+        _ALIAS_INDEX.setdefault(normalize_name(_alias), _analyte)
+_ALIAS_RE = re.compile(
+    r"(?<![a-z0-9+])(" +
+    "|".join(re.escape(alias) for alias in sorted(_ALIAS_INDEX, key=len, reverse=True)) +
+    r")(?![a-z0-9+])"
+)
+_UNIT_FACTORS = {
+    analyte.key: dict({normalize_unit(analyte.unit): 1.0},
+                      **{normalize_unit(unit): factor for unit, factor in analyte.conversions.items()})
+    for analyte in ANALYTES
+}
+
+
+def lookup_analyte(test_name):
+    """Analyte for a printed test name, or None."""
+    normalized = normalize_name(test_name)
+    analyte = _ALIAS_INDEX.get(normalized)
+    if analyte is None:
+        match = _ALIAS_RE.search(normalized)
+        if match:
+            analyte = _ALIAS_INDEX[match.group(1)]
+    return analyte
+
+
+_NUMBER = r"\d[\d,]*(?:\.\d+)?|\.\d+"
+_RANGE = (
+    rf"(?:(?:<=|>=|<|>|≤|≥|up\s+to)\s*(?:{_NUMBER})"
+    rf"|(?:{_NUMBER})\s*(?:-|–|to)\s*(?:{_NUMBER}))"
+)
+_STATUS = r"CRITICAL\s+HIGH|CRITICAL\s+LOW|CRITICAL|HIGH|LOW|NORMAL|H|L|N"
+
+# The value follows whitespace, or directly a closing bracket/colon when text
+# extraction drops the gap ("(High Sensitivity)52.480"); not after a digit, which
+# is how interleaved glyphs look ("(High Sensitivity5)2.480"). A "<"/">" range may
+# likewise be glued to the unit ("mL/min/1.73m2> 90").
+ROW_RE = re.compile(
+    rf"^(?P<name>.+?)(?:\s+|(?<=[^\d\s][)\]:]))"
+    rf"(?P<value>[<>]?\s?(?:{_NUMBER}))"
+    rf"(?:\s+(?P<unit>.+?))?(?:\s+|(?=[<>≤≥]))"
+    rf"(?P<range>{_RANGE})"
+    rf"(?:\s+(?P<status>{_STATUS}))?\s*$",
+    re.IGNORECASE,
+)
+TABLE_HEADER_RE = re.compile(r"^test\s+result\s+(?:unit\s+)?ref(?:erence)?\.?\s*range", re.IGNORECASE)
+SECTION_RE = re.compile(r"^[A-Z][A-Z0-9 &/(),+-]{3,}$")
+# Text that follows the tables: interpretation block and footer
+TABLE_END_RE = re.compile(
+    r"^(?:interpretation|impression|recommendation|remarks?|comments?|notes?|lab technician|"
+    r"consultant|pathologist|report generated|end of report)\b",
+    re.IGNORECASE,
+)
+_RANGE_RE = re.compile(_RANGE, re.IGNORECASE)
+_CRITICAL_RE = re.compile(r"\bCRITICAL\b", re.IGNORECASE)
+PATIENT_FIELD_RE = re.compile(
+    r"(Patient Name|Report Date|Age/Gender|Report ID|Referred By|Collection Time|"
+    r"Clinical History|Sample Type):\s*(.*?)(?=\s+(?:Patient Name|Report Date|Age/Gender|"
+    r"Report ID|Referred By|Collection Time|Clinical History|Sample Type):|$)"
+)
+
+
+def parse_number(text):
+    """Float from a printed number ('14,500' -> 14500.0, '< 0.5' -> 0.5)."""
+    return float(re.sub(r"[^\d.]", "", text))
+
+
+def parse_reference_range(text):
+    """
+    Parse a reference range into (low, high); open ends are None.
+    
+    '13.5 - 17.5' -> (13.5, 17.5), '< 0.04' -> (None, 0.04), '> 90' -> (90.0, None)
+    """
+    text = text.strip().lower()
+    numbers = [parse_number(n) for n in re.findall(_NUMBER, text)]
+    if text.startswith(("<", "≤", "up")):
+        return None, numbers[0]
+    if text.startswith((">", "≥")):
+        return numbers[0], None
+    return numbers[0], numbers[1]
+
+
+def _flag(value, low, high):
+    if low is None and high is None:
+        return None
+    if high is not None and value > high:
+        return 'H'
+    if low is not None and value < low:
+        return 'L'
+    return 'N'
+
+
+def parse_row(match, section=None, page=1, name=None):
+    """
+    Build a LabResult from a ROW_RE match.
+    
+    Args:
+        name: Full test name when it was wrapped over several lines
+            (default: the name in the match)
+    """
+    raw_name = (name or match.group('name')).strip()
+    raw_value = match.group('value').strip()
+    raw_unit = (match.group('unit') or "").strip()
+    raw_range = match.group('range').strip()
+    status = match.group('status')
+    status = " ".join(status.upper().split()) if status else None
+    
+    value = parse_number(raw_value)
+    low, high = parse_reference_range(raw_range)
+    flag = _flag(value, low, high)
+    
+    analyte = lookup_analyte(raw_name)
+    factor = None
+    if analyte is not None:
+        factor = _UNIT_FACTORS[analyte.key].get(normalize_unit(raw_unit))
+    
+    unit = raw_unit
+    if factor is not None:
+        value *= factor
+        low = low * factor if low is not None else None
+        high = high * factor if high is not None else None
+        unit = analyte.unit
+    
+    critical = bool(status and status.startswith('CRITICAL'))
+    if analyte is not None and factor is not None:
+        if analyte.critical_high is not None and value >= analyte.critical_high:
+            critical = True
+        if analyte.critical_low is not None and value <= analyte.critical_low:
+            critical = True
+    
+    return LabResult(
+        analyte=analyte.key if analyte else None,
+        name=analyte.name if analyte else raw_name,
+        value=value,
+        unit=unit,
+        ref_low=low,
+        ref_high=high,
+        flag=flag,
+        critical=critical,
+        unit_normalized=factor is not None,
+        raw_name=raw_name,
+        raw_value=raw_value,
+        raw_unit=raw_unit,
+        raw_range=raw_range,
+        status=status,
+        section=section,
+        page=page,
+    )
+
+
+def _continues(name, fragment):
+    """Whether a wrapped-name fragment looks like it continues the test name above it."""
+    return name.count("(") > name.count(")") or fragment[:1] in "()]" or fragment[:1].islower()
+
+
+def _name_score(name):
+    """2 for an exact analyte alias, 1 for a name containing one; +0.5 for balanced parentheses."""
+    normalized = normalize_name(name)
+    score = 2 if normalized in _ALIAS_INDEX else 1 if _ALIAS_RE.search(normalized) else 0
+    return score + 0.5 * (name.count("(") == name.count(")"))
+
+
+def _split_fragments(name, fragments, next_name=None):
+    """
+    Split the name fragments printed between two rows.
+    
+    The split that makes both test names known analytes (then balanced)
+    wins; ties go to _continues.
+    
+    Args:
+        name: Test name of the row above (None at the start of a table)
+        fragments: Lines between the two rows
+        next_name: Test name printed on the row below (None at the end of a table)
+    
+    Returns:
+        (fragments continuing `name`, fragments starting the next row's name)
+    """
+    if name is None or not fragments:
+        return [], fragments
+    heuristic = 0
+    while heuristic < len(fragments) and _continues(" ".join([name] + fragments[:heuristic]), fragments[heuristic]):
+        heuristic += 1
+    
+    def score(split):
+        total = _name_score(" ".join([name] + fragments[:split]))
+        if next_name is not None:
+            total += _name_score(" ".join(fragments[split:] + [next_name]))
+        return total, split == heuristic
+    
+    split = max(range(len(fragments) + 1), key=score)
+    return fragments[:split], fragments[split:]
+
+
+def parse_report_text(pages):
+    """
+    Parse extracted page text into a structured report.
+    
+    Test names wrapped over several lines (narrow table cells) are joined
+    back: a table line without a reference range is kept as a name fragment
+    and attached to the row above or below (see _split_fragments). Tables
+    end at a section heading, a blank line or the interpretation/footer text.
+    
+    Args:
+        pages: List of page text strings (or a single string)
+    
+    Returns:
+        Dict with 'patient' fields, typed 'results', the 'critical' and
+        'abnormal' subsets, and 'unparsed' table lines that look like results
+        (known test or CRITICAL status, with a number) but did not match
+    """
+    if isinstance(pages, str):
+        pages = [pages]
+    
+    patient = {}
+    results = []
+    unparsed = []
+    section = None
+    in_table = False
+    fragments = []   # table lines without a value since the last row
+    last = None      # (match, name, section, page) of the last row, for trailing fragments
+    
+    def end_table():
+        nonlocal in_table, last
+        if last is not None and fragments:
+            suffix, _ = _split_fragments(last[1], fragments)
+            if suffix:
+                results[-1] = parse_row(last[0], last[2], last[3], " ".join([last[1]] + suffix))
+        fragments.clear()
+        last = None
+        in_table = False
+    
+    for page_number, text in enumerate(pages, start=1):
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                if in_table:
+                    end_table()
+                continue
+            
+            if TABLE_HEADER_RE.match(line):
+                end_table()
+                in_table = True
+                continue
+            
+            if not in_table:
+                for key, value in PATIENT_FIELD_RE.findall(line):
+                    patient.setdefault(key, value.strip())
+                if SECTION_RE.match(line):
+                    section = line
+                continue
+            
+            match = ROW_RE.match(line)
+            if match is None and fragments and _RANGE_RE.search(line):
+                # Value line printed without (the start of) its name
+                joined = ROW_RE.match(" ".join(fragments + [line]))
+                if joined:
+                    match, line = joined, " ".join(fragments + [line])
+                    fragments.clear()
+            
+            if match:
+                name = match.group('name').strip()
+                if last is not None:
+                    suffix, fragments[:] = _split_fragments(last[1], fragments, name)
+                    if suffix:
+                        full = " ".join([last[1]] + suffix)
+                        results[-1] = parse_row(last[0], last[2], last[3], full)
+                name = " ".join(fragments + [name])
+                fragments.clear()
+                results.append(parse_row(match, section, page_number, name))
+                last = (match, name, section, page_number)
+            elif SECTION_RE.match(line):
+                end_table()
+                section = line
+            elif TABLE_END_RE.match(line):
+                end_table()
+            elif re.search(_NUMBER, line) and (_RANGE_RE.search(line) or _CRITICAL_RE.search(line)):
+                # Looks like a row but is garbled (e.g. overflowing cells merged
+                # by text extraction): report it rather than guess a value
+                unparsed.append({'line': line, 'section': section, 'page': page_number})
+            else:
+                # No value: part of a test name wrapped over several lines
+                fragments.append(line)
+    end_table()
+    
+    results = [asdict(result) for result in results]
+    return {
+        'patient': patient,
+        'results': results,
+        'critical': [r for r in results if r['critical']],
+        'abnormal': [r for r in results if r['flag'] in ('H', 'L')],
+        'unparsed': unparsed,
+    }
+
+
+def parse_report(path, extractor=None):
+    """
+    Extract and parse one report PDF.
+    
+    Args:
+        path: Path to the PDF
+        extractor: PDFTextExtractor to reuse (default: one with the standard cache)
+    """
+    return parse_reports([path], extractor)[path]
+
+
+def parse_reports(paths, extractor=None):
+    """Extract (in parallel, cached) and parse many report PDFs, as {path: report}."""
+    if extractor is None:
+        from extract_text import PDFTextExtractor
+        extractor = PDFTextExtractor()
+    
+    reports = {}
+    for path, pages in extractor.iter_documents(paths):
+        report = parse_report_text(pages)
+        report['source'] = path
+        reports[path] = report
+    return reports
+
+
+def format_for_prompt(report, include_normal=False):
+    """
+    Compact text block of lab findings for the LLM prompt, critical values first.
+    
+    Table lines the parser could not read are passed through verbatim when
+    they carry a CRITICAL status or name a known test, so a critical value is
+    never dropped because of a layout quirk.
+    """
+    lines = []
+    for result in report['critical']:
+        lines.append(f"CRITICAL: {_describe(result)}")
+    for entry in report.get('unparsed', []):
+        if _CRITICAL_RE.search(entry['line']):
+            lines.append(f"CRITICAL (unparsed): {entry['line']}")
+    for result in report['abnormal']:
+        if not result['critical']:
+            lines.append(f"ABNORMAL: {_describe(result)}")
+    for entry in report.get('unparsed', []):
+        if not _CRITICAL_RE.search(entry['line']) and lookup_analyte(entry['line']) is not None:
+            lines.append(f"UNPARSED: {entry['line']}")
+    if include_normal:
+        for result in report['results']:
+            if result['flag'] not in ('H', 'L') and not result['critical']:
+                lines.append(f"NORMAL: {_describe(result)}")
+    return "\n".join(lines)
+
+
+def _format_range(low, high):
+    """Reference range text from (possibly unit-normalized) bounds."""
+    if low is None:
+        return f"< {high:g}"
+    if high is None:
+        return f"> {low:g}"
+    return f"{low:g} - {high:g}"
+
+
+def _describe(result):
+    value = f"{result['value']:g} {result['unit']}".strip()
+    text = f"{result['name']} {value}"
+    if result['flag'] in ('H', 'L'):
+        # The bounds share the value's unit (raw_range is in the printed unit)
+        direction = 'high' if result['flag'] == 'H' else 'low'
+        text += f" ({direction}, ref {_format_range(result['ref_low'], result['ref_high'])})"
+    return text
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or ["sample_blood_report.pdf"]
+    reports = parse_reports(paths)
+    if len(paths) == 1:
+        reports = reports[paths[0]]
+    print(json.dumps(reports, indent=2, ensure_ascii=False))
@@ -0,0 +1,446 @@
+"""
+PDF Text Extraction Backends
+============================
+
+Pluggable registry of the PDF text extractors that may be installed
+(PyMuPDF, pypdf, PyPDF2, pdfminer.six, pdfplumber). Libraries are detected
+lazily, and every backend returns one string per page with one visual line
+(e.g. one table row) per text line, which is the layout lab_parser expects.
+
+A micro-benchmark ranks the backends on a local corpus for speed (pages/sec)
+and fidelity (line-level agreement with pdfplumber). The ranking is saved,
+and extraction uses the fastest backend that is good enough, chosen once per
+document (choose_backend), falling back to the next one when a backend fails
+or returns unusable text for that document.
+
+Usage:
+    from pdf_backends import extract_pages, rank_backends
+    
+    rank_backends(["sample_blood_report.pdf", "blood_report_unbiased.pdf"])
+    backend, pages = extract_pages("sample_blood_report.pdf")
+    
+    python check_pdf_libs.py [corpus.pdf ...]
+"""
+
+import os
+import re
+import json
+import time
+import importlib.util
+from collections import Counter
+
+
+RANKING_PATH = ".pdf_backend_ranking.json"
+REFERENCE_BACKEND = "pdfplumber"
+MIN_FIDELITY = 0.95
+
+# Used until a ranking has been saved: layout-preserving backends first, fastest first
+DEFAULT_ORDER = ["pymupdf", "pypdf", "pdfplumber", "pdfminer", "PyPDF2"]
+
+
+class PDFBackend:
+    """
+    A text extraction backend.
+    
+    Args:
+        name: Registry name
+        modules: Importable module names, any of which provides the backend
+        count_pages: fn(path) -> int
+        iter_pages: fn(path, start, stop) -> iterator of page text
+    """
+    
+    def __init__(self, name, modules, count_pages, iter_pages):
+        self.name = name
+        self.modules = modules
+        self.count_pages = count_pages
+        self.iter_pages = iter_pages
+        self._available = None
+    
+    @property
+    def available(self):
+        """Whether the library is installed (checked once, without importing it)."""
+        if self._available is None:
+            self._available = any(importlib.util.find_spec(m) is not None for m in self.modules)
+        return self._available
+
+
+BACKENDS = {}
+
+
+def register_backend(name, modules, count_pages, iter_pages):
+    """Add (or replace) a backend in the registry."""
+    BACKENDS[name] = PDFBackend(name, modules, count_pages, iter_pages)
+    return BACKENDS[name]
+
+
+def available_backends():
+    """Names of registered backends whose library is installed."""
+    return [name for name, backend in BACKENDS.items() if backend.available]
+
+
+def _join_lines(lines):
+    """Collapse runs of whitespace in each line and drop empty lines."""
+    return "\n".join(" ".join(line.split()) for line in lines if line.strip())
+
+
+# pdfplumber -------------------------------------------------------------
+
+def _pdfplumber_count(path):
+    import pdfplumber
+    
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def _pdfplumber_pages(path, start, stop):
+    import pdfplumber
+    
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages[start:stop]:
+            yield page.extract_text() or ""
+            page.close()
+
+
+# PyMuPDF ----------------------------------------------------------------
+
+def _import_pymupdf():
+    try:
+        import pymupdf
+    except ImportError:
+        import fitz as pymupdf
+    return pymupdf
+
+
+def _pymupdf_count(path):
+    with _import_pymupdf().open(path) as doc:
+        return doc.page_count
+
+
+def _pymupdf_pages(path, start, stop, y_tolerance=3.0):
+    with _import_pymupdf().open(path) as doc:
+        stop = doc.page_count if stop is None else min(stop, doc.page_count)
+        for number in range(start, stop):
+            # Group words into visual lines by vertical centre, like pdfplumber
+            words = doc[number].get_text("words")
+            words.sort(key=lambda w: ((w[1] + w[3]) / 2, w[0]))
+            rows = []
+            for x0, y0, x1, y1, word, *_ in words:
+                centre = (y0 + y1) / 2
+                if rows and centre - rows[-1][0] <= y_tolerance:
+                    rows[-1][1].append((x0, word))
+                else:
+                    rows.append((centre, [(x0, word)]))
+            yield "\n".join(" ".join(word for _, word in sorted(row)) for _, row in rows)
+
+
+# pypdf / PyPDF2 ---------------------------------------------------------
+
+def _pypdf_count(path):
+    from pypdf import PdfReader
+    
+    return len(PdfReader(path).pages)
+
+
+def _pypdf_pages(path, start, stop):
+    from pypdf import PdfReader
+    
+    for page in PdfReader(path).pages[start:stop]:
+        try:
+            text = page.extract_text(extraction_mode="layout")
+        except TypeError:
+            # pypdf < 3.17 has no layout mode
+            text = page.extract_text()
+        yield _join_lines((text or "").splitlines())
+
+
+def _pypdf2_count(path):
+    from PyPDF2 import PdfReader
+    
+    return len(PdfReader(path).pages)
+
+
+def _pypdf2_pages(path, start, stop):
+    from PyPDF2 import PdfReader
+    
+    for page in PdfReader(path).pages[start:stop]:
+        yield _join_lines((page.extract_text() or "").splitlines())
+
+
+# pdfminer.six -----------------------------------------------------------
+
+def _pdfminer_count(path):
+    from pdfminer.pdfpage import PDFPage
+    
+    with open(path, 'rb') as f:
+        return sum(1 for _ in PDFPage.get_pages(f))
+
+
+def _pdfminer_pages(path, start, stop):
+    from pdfminer.high_level import extract_text
+    
+    if stop is None:
+        stop = _pdfminer_count(path)
+    text = extract_text(path, page_numbers=list(range(start, stop)))
+    pages = text.split("\f")
+    for number in range(stop - start):
+        yield _join_lines(pages[number].splitlines()) if number < len(pages) else ""
+
+
+register_backend("pymupdf", ("pymupdf", "fitz"), _pymupdf_count, _pymupdf_pages)
+register_backend("pypdf", ("pypdf",), _pypdf_count, _pypdf_pages)
+register_backend("PyPDF2", ("PyPDF2",), _pypdf2_count, _pypdf2_pages)
+register_backend("pdfminer", ("pdfminer",), _pdfminer_count, _pdfminer_pages)
+register_backend("pdfplumber", ("pdfplumber",), _pdfplumber_count, _pdfplumber_pages)
+
+
+# Selection --------------------------------------------------------------
+
+_ranking_cache = {}
+
+
+def load_ranking(path=RANKING_PATH):
+    """Saved ranking (list of backend names, best first) or None."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    if _ranking_cache.get(path, (None,))[0] != mtime:
+        with open(path, 'r') as f:
+            _ranking_cache[path] = (mtime, json.load(f)['ranking'])
+    return _ranking_cache[path][1]
+
+
+def backend_order(preferred='auto', ranking_path=RANKING_PATH):
+    """
+    Installed backends in the order they should be tried.
+    
+    'auto' uses the saved ranking (or DEFAULT_ORDER); a backend name puts
+    that backend first and keeps the rest as fallbacks.
+    """
+    order = load_ranking(ranking_path) or DEFAULT_ORDER
+    order = [name for name in order if name in BACKENDS]
+    order += [name for name in BACKENDS if name not in order]
+    if preferred != 'auto':
+        if preferred not in BACKENDS:
+            raise ValueError(f"Unknown PDF backend: {preferred} (known: {', '.join(BACKENDS)})")
+        order = [preferred] + [name for name in order if name != preferred]
+    order = [name for name in order if BACKENDS[name].available]
+    if not order:
+        raise RuntimeError("No PDF text extraction library installed "
+                           f"(install one of: {', '.join(BACKENDS)})")
+    return order
+
+
+_GARBAGE_RE = re.compile(r"[�■\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def is_usable_text(pages, max_garbage=0.05):
+    """Per-document sanity check: some text, and few replacement/control characters."""
+    text = "".join(pages)
+    if not text.strip():
+        return False
+    return len(_GARBAGE_RE.findall(text)) <= max_garbage * len(text)
+
+
+def count_pages(path, backend='auto'):
+    """
+    Page count from the first backend that can open the PDF.
+    
+    Returns:
+        (backend name, page count)
+    """
+    errors = []
+    for name in backend_order(backend):
+        try:
+            return name, BACKENDS[name].count_pages(path)
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+    raise RuntimeError(f"No backend could open {path}: " + "; ".join(errors))
+
+
+def choose_backend(path, backend='auto', stop=None, exclude=()):
+    """
+    Pick the backend for a whole document: the first in backend_order() that
+    opens it and returns usable text for its first pages.
+    
+    Args:
+        path: PDF file
+        backend: 'auto' or a backend name to try first
+        stop: Pages [0, stop) are extracted as the probe (None = all)
+        exclude: Backend names not to try (e.g. ones that already failed on it)
+    
+    Returns:
+        (backend name, page count, list of probe page text)
+    """
+    errors = []
+    fallback = None
+    for name in backend_order(backend):
+        if name in exclude:
+            continue
+        try:
+            n_pages = BACKENDS[name].count_pages(path)
+            pages = list(BACKENDS[name].iter_pages(path, 0, stop))
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+            continue
+        if is_usable_text(pages):
+            return name, n_pages, pages
+        if fallback is None:
+            fallback = (name, n_pages, pages)
+    if fallback is not None:
+        # Nothing looked usable (e.g. scanned pages without a text layer)
+        return fallback
+    raise RuntimeError(f"No backend could extract {path}: " + "; ".join(errors))
+
+
+def extract_pages(path, start=0, stop=None, backend='auto', fallback=True):
+    """
+    Text of pages [start, stop) from the best backend that succeeds.
+    
+    Backends are tried in backend_order(); one that raises or returns
+    unusable text (see is_usable_text) falls through to the next. With
+    fallback=False only `backend` is used and its errors propagate, so every
+    range of a document comes from the backend chosen for it.
+    
+    Returns:
+        (backend name, list of page text)
+    """
+    if not fallback:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown PDF backend: {backend} (known: {', '.join(BACKENDS)})")
+        return backend, list(BACKENDS[backend].iter_pages(path, start, stop))
+    
+    errors = []
+    unusable = None
+    for name in backend_order(backend):
+        try:
+            pages = list(BACKENDS[name].iter_pages(path, start, stop))
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+            continue
+        if is_usable_text(pages):
+            return name, pages
+        if unusable is None:
+            unusable = (name, pages)
+    if unusable is not None:
+        # Nothing looked usable (e.g. scanned pages without a text layer)
+        return unusable
+    raise RuntimeError(f"No backend could extract {path}: " + "; ".join(errors))
+
+
+# Benchmark --------------------------------------------------------------
+
+def _f1(candidate, reference):
+    candidate, reference = Counter(candidate), Counter(reference)
+    total = sum(candidate.values()) + sum(reference.values())
+    if total == 0:
+        return 1.0
+    return 2 * sum((candidate & reference).values()) / total
+
+
+def text_fidelity(text, reference):
+    """
+    Agreement of extracted text with a reference extraction.
+    
+    Returns:
+        (line_f1, token_f1): F1 over whitespace-normalized lines, and over tokens
+    """
+    lines = [" ".join(line.split()) for line in text.splitlines() if line.strip()]
+    ref_lines = [" ".join(line.split()) for line in reference.splitlines() if line.strip()]
+    return _f1(lines, ref_lines), _f1(text.split(), reference.split())
+
+
+def benchmark_backends(paths, reference=REFERENCE_BACKEND, repeat=3, warmup=1):
+    """
+    Time every installed backend on a corpus and score it against the reference.
+    
+    Args:
+        paths: PDF files to benchmark on
+        reference: Backend whose output defines fidelity 1.0
+        repeat: Timed passes per backend (best pass is reported)
+        warmup: Untimed passes per backend first, so its import and first-open
+            cost is not counted as extraction time
+    
+    Returns:
+        {backend: {'pages', 'pages_per_sec', 'line_fidelity', 'token_fidelity', 'errors'}}
+    """
+    reference_text = {}
+    if BACKENDS[reference].available:
+        for path in paths:
+            reference_text[path] = "\n".join(BACKENDS[reference].iter_pages(path, 0, None))
+    
+    results = {}
+    for name in available_backends():
+        backend = BACKENDS[name]
+        
+        def run():
+            pages, errors, texts = 0, 0, {}
+            for path in paths:
+                try:
+                    page_texts = list(backend.iter_pages(path, 0, None))
+                except Exception:
+                    errors += 1
+                    continue
+                pages += len(page_texts)
+                texts[path] = "\n".join(page_texts)
+            return pages, errors, texts
+        
+        for _ in range(warmup):
+            run()
+        best = None
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            pages, errors, texts = run()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        
+        scores = [text_fidelity(texts.get(path, ""), reference_text[path]) for path in reference_text]
+        results[name] = {
+            'pages': pages,
+            'pages_per_sec': pages / best if best else 0.0,
+            'line_fidelity': sum(s[0] for s in scores) / len(scores) if scores else None,
+            'token_fidelity': sum(s[1] for s in scores) / len(scores) if scores else None,
+            'errors': errors,
+        }
+    return results
+
+
+def rank_backends(paths, min_fidelity=MIN_FIDELITY, save_path=RANKING_PATH, repeat=3):
+    """
+    Benchmark backends on a corpus and save the order extraction should use.
+    
+    Backends that are error-free with line fidelity >= min_fidelity come
+    first, fastest first; the rest follow by fidelity.
+    
+    Returns:
+        (ranking, benchmark results)
+    """
+    results = benchmark_backends(paths, repeat=repeat)
+    
+    def good_enough(name):
+        r = results[name]
+        return r['errors'] == 0 and (r['line_fidelity'] is None or r['line_fidelity'] >= min_fidelity)
+    
+    good = sorted((n for n in results if good_enough(n)), key=lambda n: -results[n]['pages_per_sec'])
+    rest = sorted((n for n in results if not good_enough(n)),
+                  key=lambda n: (-(results[n]['line_fidelity'] or 0.0), -results[n]['pages_per_sec']))
+    ranking = good + rest
+    
+    if save_path is not None:
+        tmp_path = save_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'ranking': ranking, 'min_fidelity': min_fidelity,
+                       'corpus': list(paths), 'results': results}, f, indent=2)
+        os.replace(tmp_path, save_path)
+    
+    return ranking, results
+
+
+def print_benchmark(ranking, results):
+    """Print a ranking table."""
+    print(f"{'backend':<12} {'pages/sec':>10} {'line fid.':>10} {'token fid.':>11} {'errors':>7}")
+    for name in ranking:
+        r = results[name]
+        line_fid = f"{r['line_fidelity']:.3f}" if r['line_fidelity'] is not None else "-"
+        token_fid = f"{r['token_fidelity']:.3f}" if r['token_fidelity'] is not None else "-"
+        print(f"{name:<12} {r['pages_per_sec']:>10.1f} {line_fid:>10} {token_fid:>11} {r['errors']:>7}")
@@ -0,0 +1,598 @@
+"""
+Performance Benchmark Suite
+===========================
+
+CPU-runnable benchmarks for the Python pipeline, with JSON output and
+regression checks against a stored baseline:
+    
+    collate_fn        train_medgemma_ecg collate_fn batches/sec
+    dataset_startup   train_medgemma_ecg.load_and_prepare_dataset cold/warm seconds
+    onnx_encoder      ONNX vision encoder latency, FP32 vs INT8, batch 1 vs N
+    pdf_extraction    pages/sec per pdf_backends backend and for PDFTextExtractor
+    report_rendering  report_engine PDFs/sec per layout
+    ecg_digitization  ecg_digitizer images/sec and stored signal size
+
+Inputs are tiny synthetic fixtures built in a temporary directory
+(synthetic_corpus reports, records and ECG images, and an ECGInstruct-style
+JSON file). Heavy dependencies are imported lazily, and a benchmark whose
+modules (or ONNX models) are missing is reported as skipped, not failed.
+
+Metric names ending in '_per_sec' are better when higher; all other
+metrics (seconds, milliseconds) are better when lower. A metric regresses
+when it is worse than the baseline by more than the threshold (relative).
+
+Usage:
+    python perf_benchmarks.py --output bench.json
+    python perf_benchmarks.py --save-baseline                  # store perf_baseline.json
+    python perf_benchmarks.py --baseline perf_baseline.json --threshold 0.15
+    python perf_benchmarks.py --only pdf_extraction,report_rendering --quick
+    python perf_benchmarks.py --list
+    
+    from perf_benchmarks import run_benchmarks, compare_to_baseline
+    
+    results = run_benchmarks(["report_rendering"])
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+import contextlib
+import importlib.util
+
+import numpy as np
+
+
+BASELINE_PATH = "perf_baseline.json"
+DEFAULT_THRESHOLD = 0.10
+
+DEFAULT_OPTIONS = {
+    'repeat': 3,                     # timed passes per measurement (median reported)
+    'workers': 0,                    # process pools: 0 = in-process, for stable numbers
+    'batch_size': 4,                 # collate_fn examples per batch
+    'batches': 5,                    # collate_fn batches per pass
+    'processor': None,               # local HF processor path (default: fixture processor)
+    'dataset_rows': 2000,            # rows in the synthetic ECGInstruct JSON
+    'onnx_dir': "./onnx_export",
+    'onnx_batch': 4,
+    'reports': 24,                   # synthetic PDFs for extraction
+    'records': 40,                   # synthetic records for rendering
+    'ecg_images': 16,                # synthetic ECG images for digitization
+}
+QUICK_OPTIONS = {'repeat': 1, 'batches': 2, 'dataset_rows': 300, 'reports': 8, 'records': 10, 'ecg_images': 4}
+
+TRAINING_MODULES = ('torch', 'wandb', 'datasets', 'transformers', 'peft', 'trl', 'evaluate', 'PIL')
+ONNX_MODELS = {'fp32': "vision_encoder.onnx", 'int8': "vision_encoder_quant.onnx"}
+
+
+class SkipBenchmark(Exception):
+    """Raised by a benchmark whose inputs (e.g. model files) are not available."""
+
+
+class Benchmark:
+    """
+    A registered benchmark.
+    
+    Args:
+        name: Registry name
+        modules: Importable module names that must all be installed
+        run: fn(fixtures, options) -> (metrics dict, info dict)
+    """
+    
+    def __init__(self, name, modules, run):
+        self.name = name
+        self.modules = modules
+        self.run = run
+        self._missing = None
+    
+    @property
+    def missing(self):
+        """Modules that are not installed (checked once, without importing them)."""
+        if self._missing is None:
+            self._missing = [m for m in self.modules if importlib.util.find_spec(m) is None]
+        return self._missing
+
+
+BENCHMARKS = {}
+
+
+def register_benchmark(name, modules=()):
+    """Decorator adding a benchmark function to the registry."""
+    def decorator(run):
+        BENCHMARKS[name] = Benchmark(name, tuple(modules), run)
+        return run
+    return decorator
+
+
+def higher_is_better(metric):
+    return metric.endswith('_per_sec')
+
+
+def median_time(fn, repeat, warmup=1):
+    """Median wall time of fn() over `repeat` calls, after `warmup` untimed calls."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+class Fixtures:
+    """Synthetic benchmark inputs, built on first use under one work directory."""
+    
+    def __init__(self, workdir, seed=0):
+        self.workdir = workdir
+        self.seed = seed
+        self._cache = {}
+    
+    def path(self, *parts):
+        return os.path.join(self.workdir, *parts)
+    
+    def reports(self, count):
+        """Paths of `count` synthetic blood-report PDFs (both layouts)."""
+        key = ('reports', count)
+        if key not in self._cache:
+            from synthetic_corpus import generate_corpus
+            
+            out_dir = self.path(f"reports_{count}")
+            generate_corpus(out_dir, count, self.seed, workers=0, ecg=False)
+            with open(os.path.join(out_dir, "manifest.jsonl"), 'r', encoding='utf-8') as f:
+                self._cache[key] = [os.path.join(out_dir, json.loads(line)['files']['report']) for line in f]
+        return self._cache[key]
+    
+    def records(self, count):
+        """`count` synthetic report_engine records."""
+        key = ('records', count)
+        if key not in self._cache:
+            from synthetic_corpus import generate_case
+            self._cache[key] = [generate_case(self.seed, index)['record'] for index in range(count)]
+        return self._cache[key]
+    
+    def ecg_images(self, count):
+        """Image folder with `count` synthetic 12-lead ECG PNGs under ptb-xl/, and their relative paths."""
+        key = ('ecg_images', count)
+        if key not in self._cache:
+            from synthetic_corpus import SCENARIOS, case_rng, synthesize_ecg, render_ecg
+            
+            folder = self.path("ecg_images")
+            os.makedirs(os.path.join(folder, "ptb-xl"), exist_ok=True)
+            names = []
+            scenarios = list(SCENARIOS)
+            for index in range(count):
+                spec = SCENARIOS[scenarios[index % len(scenarios)]]['ecg']
+                signals, _ = synthesize_ecg(case_rng(self.seed, index, 1), spec)
+                name = f"ptb-xl/{index:05d}_hr.png"
+                render_ecg(signals).save(os.path.join(folder, name), compress_level=1)
+                names.append(name)
+            self._cache[key] = (folder, names)
+        return self._cache[key]
+    
+    def instruct_json(self, rows, images=16):
+        """ECGInstruct-style JSON (about 60% PTB-XL rows) in its own dataset cache directory."""
+        key = ('instruct_json', rows)
+        if key not in self._cache:
+            _, names = self.ecg_images(images)
+            cache_dir = self.path(f"ecg_dataset_cache_{rows}")
+            os.makedirs(cache_dir, exist_ok=True)
+            rng = np.random.default_rng(self.seed)
+            data = []
+            for index in range(rows):
+                ptb_xl = rng.random() < 0.6
+                data.append({
+                    'id': f"fixture-{index}",
+                    'image': names[index % len(names)] if ptb_xl else f"mimic-ecg/{index:05d}.png",
+                    'conversations': _fixture_conversation(index),
+                })
+            with open(os.path.join(cache_dir, "ECGInstruct.json"), 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            self._cache[key] = cache_dir
+        return self._cache[key]
+    
+    def collate_examples(self, count, images=16):
+        """Formatted training examples (image path + messages), as collate_fn receives them."""
+        folder, names = self.ecg_images(images)
+        examples = []
+        for index in range(count):
+            question, answer = (turn['value'] for turn in _fixture_conversation(index))
+            examples.append({
+                'image': names[index % len(names)],
+                'messages': [
+                    {'role': 'user', 'content': [{'type': 'image'}, {'type': 'text', 'text': question}]},
+                    {'role': 'assistant', 'content': [{'type': 'text', 'text': answer}]},
+                ],
+            })
+        return folder, examples
+
+
+_FIXTURE_ANSWERS = (
+    "Sinus rhythm. Normal ECG.",
+    "Sinus tachycardia with ST elevation in V1-V4, consistent with acute anterior myocardial infarction.",
+    "Atrial fibrillation with rapid ventricular response. No acute ST changes.",
+    "Sinus rhythm with ST depression and T wave inversion in V4-V6, suggestive of ischemia.",
+)
+
+
+def _fixture_conversation(index):
+    return [
+        {'from': 'human', 'value': "<image>\nPlease interpret this 12-lead ECG and give the most likely diagnosis."},
+        {'from': 'gpt', 'value': _FIXTURE_ANSWERS[index % len(_FIXTURE_ANSWERS)]},
+    ]
+
+
+class _FixtureTokenizer:
+    pad_token_id = 0
+    special_tokens_map = {'boi_token': "<image>"}
+    
+    def convert_tokens_to_ids(self, token):
+        return 1
+
+
+class FixtureProcessor:
+    """
+    Stand-in for the MedGemma processor when no local processor is given.
+    
+    Images are resized to the encoder input size and scaled to float, and
+    text is byte-tokenized, so the timing covers collate_fn's own work
+    (image decoding, batching, label masking) rather than the tokenizer's.
+    """
+    
+    def __init__(self, image_size=896, max_length=2048):
+        self.image_size = image_size
+        self.max_length = max_length
+        self.tokenizer = _FixtureTokenizer()
+    
+    def apply_chat_template(self, messages, add_generation_prompt=False, tokenize=False):
+        parts = []
+        for message in messages:
+            for item in message['content']:
+                parts.append("<image>" if item['type'] == 'image' else item['text'])
+        return "\n".join(parts)
+    
+    def __call__(self, text, images, return_tensors="pt", padding=True, truncation=True):
+        import torch
+        from PIL import Image
+        
+        size = (self.image_size, self.image_size)
+        pixels = np.stack([np.asarray(image.resize(size, Image.BILINEAR)) for per_example in images
+                           for image in per_example])
+        pixel_values = torch.from_numpy(pixels).permute(0, 3, 1, 2).float().div_(255.0)
+        
+        ids = [list(t.encode('utf-8'))[:self.max_length] for t in text]
+        length = max(len(i) for i in ids)
+        input_ids = torch.zeros((len(ids), length), dtype=torch.long)
+        attention_mask = torch.zeros_like(input_ids)
+        for row, token_ids in enumerate(ids):
+            input_ids[row, :len(token_ids)] = torch.tensor(token_ids) + 2
+            attention_mask[row, :len(token_ids)] = 1
+        return {'input_ids': input_ids, 'attention_mask': attention_mask, 'pixel_values': pixel_values}
+
+
+@register_benchmark('collate_fn', TRAINING_MODULES)
+def bench_collate_fn(fixtures, options):
+    from train_medgemma_ecg import TrainingConfig, create_data_collator
+    
+    batch_size, batches = options['batch_size'], options['batches']
+    image_folder, examples = fixtures.collate_examples(batch_size * batches)
+    if options['processor']:
+        from transformers import AutoProcessor
+        processor = AutoProcessor.from_pretrained(options['processor'])
+    else:
+        processor = FixtureProcessor()
+    collate_fn = create_data_collator(processor, TrainingConfig(image_folder=image_folder))
+    
+    def run():
+        for start in range(0, len(examples), batch_size):
+            collate_fn(examples[start:start + batch_size])
+    
+    seconds = median_time(run, options['repeat'])
+    metrics = {
+        'batches_per_sec': batches / seconds,
+        'samples_per_sec': batches * batch_size / seconds,
+    }
+    return metrics, {'processor': options['processor'] or "fixture", 'batch_size': batch_size}
+
+
+@register_benchmark('dataset_startup', TRAINING_MODULES)
+def bench_dataset_startup(fixtures, options):
+    import datasets
+    from train_medgemma_ecg import TrainingConfig, load_and_prepare_dataset
+    
+    rows = options['dataset_rows']
+    config = TrainingConfig(dataset_cache_dir=fixtures.instruct_json(rows), eval_samples=max(rows // 20, 1))
+    datasets.disable_progress_bars()
+    
+    def load(cache):
+        # Redirect the HF cache so "cold" really rebuilds the Arrow files
+        datasets.config.HF_DATASETS_CACHE = cache
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            load_and_prepare_dataset(config)
+        return time.perf_counter() - start
+    
+    # The fixtures (and these caches) are deleted after the run
+    saved_cache = datasets.config.HF_DATASETS_CACHE
+    try:
+        cold = [load(fixtures.path("hf_cache", f"cold_{i}")) for i in range(options['repeat'])]
+        warm = [load(fixtures.path("hf_cache", "cold_0")) for _ in range(options['repeat'])]
+    finally:
+        datasets.config.HF_DATASETS_CACHE = saved_cache
+    metrics = {'cold_seconds': statistics.median(cold), 'warm_seconds': statistics.median(warm)}
+    return metrics, {'rows': rows}
+
+
+@register_benchmark('onnx_encoder', ('onnxruntime',))
+def bench_onnx_encoder(fixtures, options):
+    import onnxruntime as ort
+    
+    onnx_dir = options['onnx_dir']
+    models = {kind: os.path.join(onnx_dir, name) for kind, name in ONNX_MODELS.items()
+              if os.path.exists(os.path.join(onnx_dir, name))}
+    if not models:
+        raise SkipBenchmark(f"no {' / '.join(ONNX_MODELS.values())} in {onnx_dir}")
+    
+    config = {}
+    config_path = os.path.join(onnx_dir, "vision_config.json")
+    if os.path.exists(config_path):
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+    height, width = config.get('input_height', 896), config.get('input_width', 896)
+    rng = np.random.default_rng(0)
+    
+    metrics, info = {}, {'input': [height, width], 'models': {}}
+    for kind, path in models.items():
+        session = ort.InferenceSession(path, providers=['CPUExecutionProvider'])
+        info['models'][kind] = {'path': path, 'mb': os.path.getsize(path) / 2 ** 20}
+        for batch in sorted({1, options['onnx_batch']}):
+            pixel_values = rng.standard_normal((batch, 3, height, width), dtype=np.float32)
+            try:
+                seconds = median_time(lambda: session.run(None, {'pixel_values': pixel_values}), options['repeat'])
+            except Exception as e:
+                # e.g. a model exported with a fixed batch dimension
+                info['models'][kind][f"batch{batch}_error"] = str(e).splitlines()[0]
+                continue
+            metrics[f"{kind}_batch{batch}_ms_per_image"] = 1000 * seconds / batch
+        del session
+    return metrics, info
+
+
+@register_benchmark('pdf_extraction')
+def bench_pdf_extraction(fixtures, options):
+    import pdf_backends
+    from extract_text import PDFTextExtractor
+    
+    if not pdf_backends.available_backends():
+        raise SkipBenchmark("no PDF text extraction backend installed")
+    paths = fixtures.reports(options['reports'])
+    
+    results = pdf_backends.benchmark_backends(paths, repeat=options['repeat'])
+    metrics = {f"{name}_pages_per_sec": result['pages_per_sec'] for name, result in results.items()}
+    info = {name: {k: v for k, v in result.items() if k != 'pages_per_sec'} for name, result in results.items()}
+    
+    extractor = PDFTextExtractor(cache_dir=fixtures.path("pdf_text_cache"), max_workers=options['workers'] or 1)
+    start = time.perf_counter()
+    pages = sum(len(doc_pages) for _, doc_pages in extractor.iter_documents(paths))
+    metrics['extractor_cold_pages_per_sec'] = pages / (time.perf_counter() - start)
+    seconds = median_time(lambda: extractor.extract_many(paths), options['repeat'], warmup=0)
+    metrics['extractor_cached_pages_per_sec'] = pages / seconds
+    info['documents'], info['pages'] = len(paths), pages
+    return metrics, info
+
+
+@register_benchmark('report_rendering')
+def bench_report_rendering(fixtures, options):
+    import logging
+    from report_engine import RENDER_BACKENDS, render_batch
+    
+    backends = [b for b in RENDER_BACKENDS if importlib.util.find_spec(b) is not None]
+    if not backends:
+        raise SkipBenchmark("neither reportlab nor xhtml2pdf is installed")
+    logging.getLogger("xhtml2pdf").setLevel(logging.ERROR)
+    records = fixtures.records(options['records'])
+    
+    metrics, info = {}, {'records': len(records)}
+    for backend in backends:
+        sizes = []
+        
+        def run():
+            sizes[:] = [len(pdf) for _, pdf in render_batch(records, backend, workers=options['workers'])]
+        
+        seconds = median_time(run, options['repeat'])
+        metrics[f"{backend}_pdfs_per_sec"] = len(records) / seconds
+        info[f"{backend}_mean_kb"] = sum(sizes) / len(sizes) / 1024
+    return metrics, info
+
+
+@register_benchmark('ecg_digitization', ('PIL',))
+def bench_ecg_digitization(fixtures, options):
+    import io
+    from ecg_digitizer import digitize
+    
+    folder, names = fixtures.ecg_images(options['ecg_images'])
+    paths = [os.path.join(folder, name) for name in names]
+    
+    seconds = median_time(lambda: [digitize(path) for path in paths], options['repeat'])
+    stored = 0
+    for path in paths:
+        buffer = io.BytesIO()
+        digitize(path).save(buffer)
+        stored += buffer.tell()
+    metrics = {'images_per_sec': len(paths) / seconds}
+    info = {
+        'images': len(paths),
+        'mean_kb': stored / len(paths) / 1024,
+        'smaller_than_png': sum(os.path.getsize(path) for path in paths) / stored,
+    }
+    return metrics, info
+
+
+def environment():
+    """Machine and code version the results were measured on."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+    }
+
+
+def run_benchmarks(names=None, options=None, workdir=None, verbose=True):
+    """
+    Run benchmarks and collect their results.
+    
+    Args:
+        names: Benchmark names (default: all registered)
+        options: Overrides for DEFAULT_OPTIONS
+        workdir: Fixture directory (default: a temporary directory)
+        verbose: Print one line per benchmark
+    
+    Returns:
+        {'environment', 'options', 'benchmarks': {name: {'status', 'seconds',
+        'metrics', 'info' | 'reason'}}}, status being 'ok', 'skipped' or 'error'
+    """
+    options = dict(DEFAULT_OPTIONS, **(options or {}))
+    names = list(names or BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmark(s): {', '.join(unknown)} (choose from {', '.join(BENCHMARKS)})")
+    
+    results = {'environment': environment(), 'options': options, 'benchmarks': {}}
+    with contextlib.ExitStack() as stack:
+        if workdir is None:
+            workdir = stack.enter_context(tempfile.TemporaryDirectory(prefix="perf_bench_"))
+        fixtures = Fixtures(workdir)
+        
+        for name in names:
+            benchmark = BENCHMARKS[name]
+            start = time.perf_counter()
+            if benchmark.missing:
+                entry = {'status': 'skipped', 'reason': f"missing modules: {', '.join(benchmark.missing)}"}
+            else:
+                try:
+                    metrics, info = benchmark.run(fixtures, options)
+                    entry = {'status': 'ok', 'metrics': metrics, 'info': info}
+                except SkipBenchmark as e:
+                    entry = {'status': 'skipped', 'reason': str(e)}
+                except Exception as e:
+                    entry = {'status': 'error', 'reason': f"{type(e).__name__}: {e}"}
+            entry['seconds'] = time.perf_counter() - start
+            results['benchmarks'][name] = entry
+            
+            if verbose:
+                if entry['status'] == 'ok':
+                    summary = "  ".join(f"{k}={v:.4g}" for k, v in entry['metrics'].items())
+                else:
+                    summary = f"{entry['status'].upper()}: {entry['reason']}"
+                print(f"{name:<18} {summary}", flush=True)
+    return results
+
+
+def compare_to_baseline(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare metrics present in both result sets.
+    
+    Args:
+        results: Output of run_benchmarks
+        baseline: Stored output of run_benchmarks
+        threshold: Allowed relative slowdown (0.10 = 10%)
+    
+    Returns:
+        List of {'benchmark', 'metric', 'baseline', 'current', 'change', 'regression'},
+        change being the relative improvement (negative = slower)
+    """
+    comparisons = []
+    for name, entry in results['benchmarks'].items():
+        base_entry = baseline.get('benchmarks', {}).get(name, {})
+        if entry.get('status') != 'ok' or base_entry.get('status') != 'ok':
+            continue
+        for metric, current in entry['metrics'].items():
+            base = base_entry['metrics'].get(metric)
+            if not base or current is None:
+                continue
+            change = current / base - 1 if higher_is_better(metric) else base / current - 1 if current else 0.0
+            comparisons.append({
+                'benchmark': name,
+                'metric': metric,
+                'baseline': base,
+                'current': current,
+                'change': change,
+                'regression': change < -threshold,
+            })
+    return comparisons
+
+
+def print_comparison(comparisons, threshold=DEFAULT_THRESHOLD):
+    print(f"\n{'Benchmark':<18} {'Metric':<36} {'Baseline':>11} {'Current':>11} {'Change':>8}")
+    for c in comparisons:
+        mark = "  REGRESSION" if c['regression'] else ""
+        print(f"{c['benchmark']:<18} {c['metric']:<36} {c['baseline']:>11.4g} {c['current']:>11.4g} "
+              f"{c['change']:>+8.1%}{mark}")
+    regressions = sum(c['regression'] for c in comparisons)
+    print(f"\n{regressions} regression(s) beyond {threshold:.0%} in {len(comparisons)} compared metric(s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run pipeline performance benchmarks")
+    parser.add_argument("--only", help="Comma-separated benchmark names")
+    parser.add_argument("--list", action="store_true", help="List benchmarks and missing modules")
+    parser.add_argument("--quick", action="store_true", help="Smaller fixtures and a single timed pass")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Compare against this results JSON")
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE_PATH, metavar="PATH",
+                        help=f"Store the results as the baseline (default: {BASELINE_PATH})")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed relative slowdown before a metric counts as a regression")
+    parser.add_argument("--repeat", type=int)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--onnx-dir")
+    parser.add_argument("--processor", help="Local HF processor for collate_fn (default: fixture processor)")
+    parser.add_argument("--workdir", help="Keep fixtures in this directory (default: temporary)")
+    args = parser.parse_args(argv)
+    
+    if args.list:
+        for name, benchmark in BENCHMARKS.items():
+            missing = f"  (missing: {', '.join(benchmark.missing)})" if benchmark.missing else ""
+            print(f"{name}{missing}")
+        return 0
+    
+    options = dict(QUICK_OPTIONS) if args.quick else {}
+    for key in ('repeat', 'workers', 'onnx_dir', 'processor'):
+        if getattr(args, key) is not None:
+            options[key] = getattr(args, key)
+    
+    names = args.only.split(",") if args.only else None
+    results = run_benchmarks(names, options, args.workdir)
+    
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+            print(f"Wrote {path}")
+    
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        comparisons = compare_to_baseline(results, baseline, args.threshold)
+        print_comparison(comparisons, args.threshold)
+        if any(c['regression'] for c in comparisons):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,214 @@
+"""
+Batch Patient Report Rendering
+==============================
+
+Renders a stream of patient/lab records (JSON Lines) to PDF across a
+process pool, with either layout:
+
+    reportlab   generate_report_pdf_v2 (styles built once per worker)
+    xhtml2pdf   generate_report_pdf (HTML template compiled once per worker)
+
+Each record has the shape of generate_report_pdf_v2.SAMPLE_RECORD:
+patient fields, lab sections with rows (test/result/unit/range, optional
+status and critical flag), interpretation lines and footer details.
+Reports are returned as in-memory PDF bytes or written to an output directory.
+
+Usage:
+    from report_engine import iter_records, render_batch
+    
+    for index, pdf_bytes in render_batch(iter_records("records.jsonl")):
+        ...
+    
+    python report_engine.py records.jsonl --out-dir reports/ --backend xhtml2pdf
+    python report_engine.py records.jsonl --benchmark
+    python report_engine.py --benchmark --count 200    # sample record x 200
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+
+
+RENDER_BACKENDS = ('reportlab', 'xhtml2pdf')
+
+# Per-process renderers by backend, filled by get_renderer
+_renderers = {}
+
+
+def get_renderer(backend):
+    """
+    Renderer fn(record, dest) for a backend, importing the layout and
+    building its styles/template once per process.
+    """
+    if backend in _renderers:
+        return _renderers[backend]
+    
+    if backend == 'reportlab':
+        import generate_report_pdf_v2 as layout
+        
+        styles = layout.build_styles()
+        
+        def render(record, dest):
+            layout.create_report(dest, record, styles)
+    elif backend == 'xhtml2pdf':
+        import generate_report_pdf as layout
+        
+        def render(record, dest):
+            err = layout.create_report(dest, record)
+            if err:
+                raise RuntimeError(f"xhtml2pdf reported {err} error(s) rendering "
+                                   f"{record['patient'].get('report_id')}")
+    else:
+        raise ValueError(f"Unknown render backend: {backend} (choose from {', '.join(RENDER_BACKENDS)})")
+    
+    _renderers[backend] = render
+    return render
+
+
+def _init_worker(*backends):
+    """Process-pool initializer: build renderers before the first task arrives."""
+    for backend in backends:
+        get_renderer(backend)
+
+
+def render_record(record, backend='reportlab', dest=None):
+    """
+    Render one record in this process.
+    
+    Args:
+        record: Patient/lab record dict
+        backend: 'reportlab' or 'xhtml2pdf'
+        dest: Output path, or None to return the PDF as bytes
+    
+    Returns:
+        PDF bytes, or dest when writing to a file
+    """
+    render = get_renderer(backend)
+    if dest is None:
+        buffer = io.BytesIO()
+        render(record, buffer)
+        return buffer.getvalue()
+    render(record, dest)
+    return dest
+
+
+def _render_task(task):
+    index, record, dest, backend = task
+    return index, render_record(record, backend, dest)
+
+
+def iter_records(path):
+    """Yield records from a JSON Lines file, skipping blank lines."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def output_path(out_dir, index, record):
+    """File name for a rendered record: <report_id>_<index>.pdf."""
+    report_id = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(record["patient"].get("report_id", "report")))
+    return os.path.join(out_dir, f"{report_id}_{index:06d}.pdf")
+
+
+def render_batch(records, backend='reportlab', out_dir=None, workers=None, chunksize=8):
+    """
+    Render many records across a process pool.
+    
+    Records are consumed lazily in windows, so arbitrarily long JSON Lines
+    streams are rendered in bounded memory.
+    
+    Args:
+        records: Iterable of record dicts
+        backend: 'reportlab' or 'xhtml2pdf'
+        out_dir: Write PDFs here; None returns in-memory bytes
+        workers: Process count (default: os.cpu_count()); 0 renders in this process
+        chunksize: Records sent to a worker per task
+    
+    Yields:
+        (index, PDF bytes or output path) in input order
+    """
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+    tasks = (
+        (index, record, output_path(out_dir, index, record) if out_dir is not None else None, backend)
+        for index, record in enumerate(records)
+    )
+    
+    if workers == 0:
+        for task in tasks:
+            yield _render_task(task)
+        return
+    
+    workers = workers or os.cpu_count() or 1
+    window = workers * chunksize * 4
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(backend,)) as pool:
+        while True:
+            batch = list(islice(tasks, window))
+            if not batch:
+                break
+            yield from pool.map(_render_task, batch, chunksize=chunksize)
+
+
+def benchmark_rendering(records, backends=RENDER_BACKENDS, workers=None, chunksize=8):
+    """
+    Render the same records with each backend to in-memory bytes and report PDFs/sec.
+    
+    Returns:
+        {backend: {'pdfs', 'seconds', 'pdfs_per_sec', 'mean_kb'}}
+    """
+    records = list(records)
+    results = {}
+    for backend in backends:
+        start = time.perf_counter()
+        sizes = [len(pdf) for _, pdf in render_batch(records, backend, None, workers, chunksize)]
+        elapsed = time.perf_counter() - start
+        results[backend] = {
+            'pdfs': len(sizes),
+            'seconds': elapsed,
+            'pdfs_per_sec': len(sizes) / elapsed if elapsed else 0.0,
+            'mean_kb': sum(sizes) / max(len(sizes), 1) / 1024,
+        }
+        print(f"{backend:<10} {len(sizes):>6} PDFs in {elapsed:7.2f}s  "
+              f"{results[backend]['pdfs_per_sec']:8.1f} PDFs/sec  ({results[backend]['mean_kb']:.1f} KB avg)")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-render patient lab reports to PDF")
+    parser.add_argument("records", nargs="?", help="JSON Lines file of patient/lab records")
+    parser.add_argument("--backend", choices=RENDER_BACKENDS, default="reportlab")
+    parser.add_argument("--out-dir", help="Write PDFs here (default: render in memory only)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (0 = in-process)")
+    parser.add_argument("--chunksize", type=int, default=8)
+    parser.add_argument("--benchmark", action="store_true", help="Report PDFs/sec for both backends")
+    parser.add_argument("--count", type=int, default=100, help="Sample records to use when no file is given")
+    args = parser.parse_args(argv)
+    
+    if args.records:
+        records = iter_records(args.records)
+    else:
+        from generate_report_pdf_v2 import SAMPLE_RECORD
+        records = (SAMPLE_RECORD for _ in range(args.count))
+    
+    if args.benchmark:
+        benchmark_rendering(records, workers=args.workers, chunksize=args.chunksize)
+        return
+    
+    start = time.perf_counter()
+    count = 0
+    for count, _ in enumerate(render_batch(records, args.backend, args.out_dir, args.workers, args.chunksize), 1):
+        pass
+    elapsed = time.perf_counter() - start
+    print(f"Rendered {count} reports with {args.backend} in {elapsed:.2f}s "
+          f"({count / elapsed if elapsed else 0.0:.1f} PDFs/sec)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
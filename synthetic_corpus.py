@@ -0,0 +1,776 @@
+"""
+Synthetic Patient Case Corpus
+=============================
+
+Seeded, reproducible load-testing corpus of patient cases. Each case is a
+blood report PDF rendered with one of the create_report layouts (reportlab
+generate_report_pdf_v2 or xhtml2pdf generate_report_pdf, via report_engine),
+an optional synthetic 12-lead ECG image, and a ground-truth JSON file with
+every printed analyte value, reference range, H/L flag and critical flag.
+
+Cases are drawn from clinical scenarios (STEMI, NSTEMI, heart failure, AF,
+renal impairment, sepsis, normal) so lab values, history, interpretation
+and ECG findings agree. Serial cardiac-marker panels vary the page count.
+Every case is generated from its own (seed, index) random stream, so any
+case can be regenerated alone and the corpus is identical for any worker
+count; PDFs are written in reportlab's invariant mode (byte-reproducible).
+
+Output layout (out_dir/):
+    corpus.json                 generator seed and options
+    manifest.jsonl              one line per case: id, scenario, backend, pages, files
+    reports/case_000000.pdf     blood report
+    ecg/case_000000.png         12-lead ECG (3x4 + lead II rhythm strip)
+    ecg/case_000000.npz         true per-lead signals (with ecg_signals=True)
+    truth/case_000000.json      ground truth (results, ECG findings, source record)
+
+Usage:
+    python synthetic_corpus.py corpus/ --count 10000
+    python synthetic_corpus.py corpus/ --count 500 --xhtml2pdf-fraction 0.5 --no-ecg
+    python synthetic_corpus.py corpus/ --check 200    # parse PDFs, compare to truth
+    
+    from synthetic_corpus import generate_case, generate_corpus
+    
+    case = generate_case(seed=0, index=42)    # record + ground truth, no files
+    generate_corpus("corpus/", count=10000, workers=8)
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from lab_parser import ANALYTES, parse_reference_range
+
+
+@dataclass
+class AnalyteSpec:
+    """How one analyte is printed and sampled on a synthetic report."""
+    key: str          # lab_parser Analyte.key
+    names: tuple      # printed test-name variants
+    unit: str
+    range: str        # printed reference range, e.g. '< 0.04', '3.5 - 5.0'
+    normal: tuple     # (low, high) sampled for an unaffected patient
+    decimals: int     # printed precision; negative rounds to tens/hundreds
+    thousands: bool = False
+
+
+PANELS = {
+    'cardiac': ("CARDIAC BIOMARKERS", True, [
+        AnalyteSpec('troponin_i', ("Troponin I (hs)", "Cardiac Troponin I (High Sensitivity)", "hs-Troponin I"),
+                    "ng/mL", "< 0.04", (0.002, 0.03), 3),
+        AnalyteSpec('troponin_t', ("Troponin T (hs)", "hs-cTnT"), "ng/mL", "< 0.014", (0.003, 0.012), 3),
+        AnalyteSpec('ck_mb', ("CK-MB", "CK-MB Mass"), "U/L", "< 25", (5, 22), 1),
+        AnalyteSpec('nt_probnp', ("NT-proBNP",), "pg/mL", "< 125", (20, 110), 0),
+        AnalyteSpec('bnp', ("BNP", "B-type Natriuretic Peptide"), "pg/mL", "< 100", (10, 90), 0),
+        AnalyteSpec('myoglobin', ("Myoglobin",), "ng/mL", "< 70", (20, 60), 0),
+        AnalyteSpec('hs_crp', ("hs-CRP", "C-Reactive Protein (hs)"), "mg/L", "< 3.0", (0.3, 2.8), 1),
+        AnalyteSpec('d_dimer', ("D-Dimer",), "ug/mL FEU", "< 0.50", (0.10, 0.45), 2),
+    ]),
+    'cbc': ("COMPLETE BLOOD COUNT (CBC)", False, [
+        AnalyteSpec('hemoglobin', ("Hemoglobin", "Haemoglobin (Hb)"), "g/dL", "13.5 - 17.5", (13.6, 17.0), 1),
+        AnalyteSpec('rbc', ("RBC Count", "Red Blood Cell Count"), "million/uL", "4.5 - 5.9", (4.6, 5.8), 2),
+        AnalyteSpec('wbc', ("WBC Count", "Total Leukocyte Count (TLC)"), "/uL", "4,000 - 11,000",
+                    (4500, 10500), -2, True),
+        AnalyteSpec('platelets', ("Platelet Count",), "/uL", "150,000 - 400,000", (160000, 390000), -3, True),
+        AnalyteSpec('hematocrit', ("Hematocrit (PCV)", "Hematocrit"), "%", "41 - 53", (41.5, 52.0), 1),
+        AnalyteSpec('mcv', ("MCV",), "fL", "80 - 100", (82, 98), 1),
+        AnalyteSpec('mch', ("MCH",), "pg", "27 - 33", (27.5, 32.5), 1),
+        AnalyteSpec('mchc', ("MCHC",), "g/dL", "32 - 36", (32.5, 35.5), 1),
+    ]),
+    'renal': ("ELECTROLYTES & RENAL FUNCTION", False, [
+        AnalyteSpec('potassium', ("Potassium (K+)", "Serum Potassium"), "mEq/L", "3.5 - 5.0", (3.6, 4.9), 1),
+        AnalyteSpec('sodium', ("Sodium (Na+)", "Serum Sodium"), "mEq/L", "136 - 145", (137, 144), 0),
+        AnalyteSpec('chloride', ("Chloride",), "mEq/L", "98 - 107", (99, 106), 0),
+        AnalyteSpec('magnesium', ("Magnesium",), "mg/dL", "1.7 - 2.2", (1.75, 2.15), 1),
+        AnalyteSpec('calcium', ("Calcium (Total)",), "mg/dL", "8.6 - 10.2", (8.7, 10.1), 1),
+        AnalyteSpec('creatinine', ("Creatinine", "Serum Creatinine"), "mg/dL", "0.7 - 1.3", (0.75, 1.25), 2),
+        AnalyteSpec('bun', ("BUN", "Blood Urea Nitrogen"), "mg/dL", "7 - 20", (8, 19), 0),
+        AnalyteSpec('egfr', ("eGFR",), "mL/min/1.73m2", "> 90", (92, 125), 0),
+    ]),
+    'coagulation': ("COAGULATION PROFILE", False, [
+        AnalyteSpec('pt', ("Prothrombin Time (PT)",), "seconds", "11.0 - 13.5", (11.2, 13.3), 1),
+        AnalyteSpec('inr', ("INR",), "ratio", "0.8 - 1.2", (0.85, 1.15), 2),
+        AnalyteSpec('aptt', ("aPTT",), "seconds", "25 - 35", (26, 34), 1),
+        AnalyteSpec('fibrinogen', ("Fibrinogen",), "mg/dL", "200 - 400", (210, 390), 0),
+    ]),
+    'thyroid': ("THYROID FUNCTION", False, [
+        AnalyteSpec('tsh', ("TSH",), "uIU/mL", "0.4 - 4.0", (0.6, 3.8), 2),
+        AnalyteSpec('ft4', ("Free T4",), "ng/dL", "0.8 - 1.8", (0.85, 1.75), 2),
+        AnalyteSpec('ft3', ("Free T3",), "pg/mL", "2.3 - 4.2", (2.4, 4.1), 2),
+    ]),
+    'metabolic': ("GLUCOSE & LIPID PROFILE", False, [
+        AnalyteSpec('glucose', ("Random Blood Sugar (RBS)", "Glucose"), "mg/dL", "70 - 140", (78, 135), 0),
+        AnalyteSpec('hba1c', ("HbA1c",), "%", "4.0 - 5.6", (4.3, 5.5), 1),
+        AnalyteSpec('cholesterol_total', ("Total Cholesterol",), "mg/dL", "< 200", (140, 195), 0),
+        AnalyteSpec('ldl', ("LDL Cholesterol",), "mg/dL", "< 100", (60, 98), 0),
+        AnalyteSpec('hdl', ("HDL Cholesterol",), "mg/dL", "> 40", (42, 65), 0),
+        AnalyteSpec('triglycerides', ("Triglycerides",), "mg/dL", "< 150", (70, 145), 0),
+    ]),
+}
+
+# Critical limits come from the parser's canonical analyte table
+_CRITICAL = {analyte.key: (analyte.critical_low, analyte.critical_high) for analyte in ANALYTES}
+_REF_BOUNDS = {spec.key: parse_reference_range(spec.range)
+               for _, _, specs in PANELS.values() for spec in specs}
+
+# Scenario: sampling weight, age range, histories, panels beyond cardiac
+# (always printed), lab effects {analyte: (low, high) sampled log-uniform},
+# interpretation, recommendation and ECG findings
+SCENARIOS = {
+    'normal': dict(
+        weight=0.22, ages=(22, 70),
+        history=("Routine Cardiac Evaluation", "Atypical Chest Pain", "Pre-operative Screening"),
+        panels=('cbc', 'renal', 'metabolic'),
+        effects={},
+        interpretation=("Cardiac biomarkers within reference limits.",
+                        "No biochemical evidence of acute myocardial injury."),
+        recommendation="Clinical correlation advised; repeat testing only if symptoms recur.",
+        ecg=dict(rhythm='sinus', rate=(58, 92)),
+    ),
+    'stemi_anterior': dict(
+        weight=0.16, ages=(38, 82),
+        history=("Acute Chest Pain; Shortness of Breath", "Acute Chest Pain; Suspected Anterolateral STEMI",
+                 "Crushing Retrosternal Chest Pain; Diaphoresis"),
+        panels=('cbc', 'renal', 'coagulation'),
+        effects={'troponin_i': (0.5, 80.0), 'troponin_t': (0.15, 8.0), 'ck_mb': (40, 320),
+                 'myoglobin': (110, 900), 'nt_probnp': (200, 2500), 'bnp': (120, 900),
+                 'hs_crp': (3.5, 25.0), 'wbc': (11500, 19000)},
+        interpretation=("Biomarker profile consistent with Acute Myocardial Infarction (Anterior STEMI).",
+                        "Markedly elevated Troponin and CK-MB indicate significant myocardial necrosis."),
+        recommendation="Immediate cardiological intervention (Angiography/PCI) is recommended.",
+        ecg=dict(rhythm='sinus', rate=(78, 115),
+                 st={'V1': (1.5, 3.0), 'V2': (2.0, 4.5), 'V3': (2.0, 4.5), 'V4': (1.5, 3.5),
+                     'I': (0.5, 1.5), 'aVL': (0.5, 1.5),
+                     'II': (-1.0, -0.5), 'III': (-1.5, -0.5), 'aVF': (-1.5, -0.5)}),
+    ),
+    'stemi_inferior': dict(
+        weight=0.12, ages=(38, 82),
+        history=("Acute Epigastric and Chest Pain", "Chest Pain with Bradycardia; Suspected Inferior STEMI"),
+        panels=('cbc', 'renal', 'coagulation'),
+        effects={'troponin_i': (0.5, 60.0), 'troponin_t': (0.12, 6.0), 'ck_mb': (35, 260),
+                 'myoglobin': (90, 700), 'hs_crp': (3.2, 20.0), 'wbc': (11200, 17500)},
+        interpretation=("Biomarker profile consistent with Acute Myocardial Infarction (Inferior STEMI).",
+                        "Elevated Troponin and CK-MB indicate myocardial necrosis."),
+        recommendation="Immediate cardiological intervention (Angiography/PCI) is recommended.",
+        ecg=dict(rhythm='sinus', rate=(48, 85),
+                 st={'II': (1.5, 3.5), 'III': (2.0, 4.0), 'aVF': (1.5, 3.5),
+                     'I': (-1.5, -0.5), 'aVL': (-2.0, -0.5)}),
+    ),
+    'nstemi': dict(
+        weight=0.12, ages=(45, 85),
+        history=("Chest Discomfort at Rest", "Unstable Angina; Rule out NSTEMI"),
+        panels=('cbc', 'renal', 'metabolic'),
+        effects={'troponin_i': (0.06, 3.0), 'troponin_t': (0.02, 0.4), 'ck_mb': (26, 70),
+                 'hs_crp': (3.2, 12.0), 'ldl': (110, 210), 'cholesterol_total': (205, 290)},
+        interpretation=("Troponin elevation without marked CK-MB rise; consistent with NSTEMI.",
+                        "Dyslipidemia noted."),
+        recommendation="Early invasive strategy and antiplatelet therapy per ACS protocol are advised.",
+        ecg=dict(rhythm='sinus', rate=(65, 100),
+                 st={'V4': (-2.0, -1.0), 'V5': (-2.0, -1.0), 'V6': (-1.5, -0.5),
+                     'I': (-1.0, -0.5), 'II': (-1.0, -0.5)},
+                 t_inverted=('V4', 'V5', 'V6', 'I')),
+    ),
+    'heart_failure': dict(
+        weight=0.12, ages=(55, 90),
+        history=("Progressive Dyspnea; Bilateral Pedal Edema", "Orthopnea; Known LV Dysfunction"),
+        panels=('cbc', 'renal', 'thyroid'),
+        effects={'nt_probnp': (600, 12000), 'bnp': (250, 3500), 'troponin_i': (0.03, 0.2),
+                 'sodium': (124, 134), 'creatinine': (1.4, 2.6), 'egfr': (28, 58), 'bun': (24, 55),
+                 'hemoglobin': (9.0, 12.8)},
+        interpretation=("Markedly elevated natriuretic peptides consistent with decompensated heart failure.",
+                        "Hyponatremia and impaired renal function noted."),
+        recommendation="Echocardiography and diuretic optimization are recommended.",
+        ecg=dict(rhythm='sinus', rate=(88, 125), voltage=0.6),
+    ),
+    'atrial_fibrillation': dict(
+        weight=0.12, ages=(50, 90),
+        history=("Palpitations; Irregular Pulse", "Palpitations with Dizziness"),
+        panels=('cbc', 'renal', 'thyroid', 'coagulation'),
+        effects={'tsh': (0.01, 0.3), 'ft4': (1.9, 3.8), 'ft3': (4.4, 8.0),
+                 'inr': (1.3, 3.8), 'pt': (14.0, 32.0), 'magnesium': (1.2, 1.6)},
+        interpretation=("Suppressed TSH with raised free thyroid hormones (hyperthyroid state).",
+                        "Prolonged INR on anticoagulation."),
+        recommendation="Rate control, anticoagulation review and endocrinology referral are advised.",
+        ecg=dict(rhythm='af', rate=(95, 150)),
+    ),
+    'renal_hyperkalemia': dict(
+        weight=0.08, ages=(45, 88),
+        history=("Chronic Kidney Disease; Generalized Weakness", "Reduced Urine Output; Fatigue"),
+        panels=('cbc', 'renal', 'metabolic'),
+        effects={'potassium': (5.4, 7.4), 'creatinine': (2.4, 7.5), 'bun': (40, 120),
+                 'egfr': (6, 29), 'hemoglobin': (7.5, 11.0), 'calcium': (7.2, 8.4),
+                 'glucose': (150, 380), 'hba1c': (6.8, 11.5)},
+        interpretation=("Hyperkalemia with severely reduced eGFR.",
+                        "Normocytic anemia consistent with chronic kidney disease."),
+        recommendation="Urgent potassium-lowering therapy and nephrology review are recommended.",
+        ecg=dict(rhythm='sinus', rate=(55, 85), t_peaked=True),
+    ),
+    'sepsis': dict(
+        weight=0.06, ages=(30, 90),
+        history=("Fever with Rigors; Hypotension", "Suspected Sepsis; Tachycardia"),
+        panels=('cbc', 'renal', 'coagulation'),
+        effects={'wbc': (14000, 34000), 'hs_crp': (40, 250), 'platelets': (35000, 140000),
+                 'd_dimer': (0.8, 6.0), 'creatinine': (1.4, 3.0), 'aptt': (36, 110),
+                 'troponin_i': (0.04, 0.25)},
+        interpretation=("Marked leukocytosis and raised CRP consistent with systemic infection.",
+                        "Thrombocytopenia and raised D-Dimer; evaluate for DIC."),
+        recommendation="Blood cultures and early broad-spectrum antibiotics are recommended.",
+        ecg=dict(rhythm='sinus', rate=(105, 140)),
+    ),
+}
+_SCENARIO_NAMES = tuple(SCENARIOS)
+_SCENARIO_WEIGHTS = np.array([SCENARIOS[name]['weight'] for name in _SCENARIO_NAMES])
+_SCENARIO_WEIGHTS = _SCENARIO_WEIGHTS / _SCENARIO_WEIGHTS.sum()
+
+FIRST_NAMES = {
+    'Male': ("Rajesh", "Arjun", "Vikram", "Suresh", "Mohammed", "Anil", "Rahul", "Karthik", "Joseph",
+             "Ravi", "Sanjay", "Imran", "Deepak", "Harish", "Manoj", "Thomas"),
+    'Female': ("Priya", "Lakshmi", "Anjali", "Fatima", "Meera", "Sunita", "Kavya", "Deepa", "Mary",
+               "Neha", "Revathi", "Ayesha", "Pooja", "Shalini", "Geetha", "Sarah"),
+}
+LAST_NAMES = ("Kumar", "Sharma", "Nair", "Reddy", "Iyer", "Khan", "Patel", "Menon", "Singh", "Das",
+              "Joseph", "Pillai", "Gupta", "Rao", "Verma", "Fernandes", "Mukherjee", "Bhat")
+DOCTORS = ("Dr. Ananya Sharma", "Dr. Vivek Menon", "Dr. S. Raghavan", "Dr. Farah Siddiqui",
+           "Dr. Thomas Kurian", "Dr. Meenakshi Iyer", "Dr. Rohan Kapoor")
+PATHOLOGISTS = ("Dr. Priya Mehta, MD", "Dr. Arvind Rao, MD", "Dr. Nisha George, DCP", "Dr. K. Balan, MD")
+SAMPLE_TYPES = ("Venous Blood", "Serum", "Venous Blood (EDTA + Plain)")
+BASE_DATE = datetime(2025, 1, 1)
+
+
+def case_rng(seed, index, stream=0):
+    """Independent random stream for one case (stream 0: record, 1: ECG)."""
+    return np.random.default_rng([seed, index, stream])
+
+
+def _log_uniform(rng, low, high):
+    return float(np.exp(rng.uniform(np.log(low), np.log(high))))
+
+
+def format_value(value, decimals, thousands=False):
+    """Printed result: fixed decimals, optional thousands separators."""
+    return f"{value:{',' if thousands else ''}.{max(decimals, 0)}f}"
+
+
+def _sample_value(rng, spec, effects, incidental_rate):
+    """Sample one analyte in its printed unit, rounded to printed precision."""
+    low, high = _REF_BOUNDS[spec.key]
+    if spec.key in effects:
+        value = _log_uniform(rng, *effects[spec.key])
+    elif rng.random() < incidental_rate:
+        # Incidental, mildly out-of-range value
+        if high is not None and (low is None or rng.random() < 0.5):
+            value = high * rng.uniform(1.05, 1.6)
+        else:
+            value = low * rng.uniform(0.7, 0.95)
+    else:
+        value = rng.uniform(*spec.normal)
+    return float(round(value, spec.decimals))
+
+
+def _flag(value, low, high):
+    if high is not None and value > high:
+        return 'H'
+    if low is not None and value < low:
+        return 'L'
+    return 'N'
+
+
+def _is_critical(key, value):
+    critical_low, critical_high = _CRITICAL[key]
+    return ((critical_high is not None and value >= critical_high) or
+            (critical_low is not None and value <= critical_low))
+
+
+def _status(flag, critical):
+    label = {'H': "HIGH", 'L': "LOW", 'N': "NORMAL"}[flag]
+    return f"CRITICAL {label}" if critical else label
+
+
+def build_panel(rng, panel, effects, title=None, incidental_rate=0.05):
+    """
+    Sample one lab panel.
+    
+    Returns:
+        (record section dict, list of ground-truth result dicts)
+    """
+    default_title, status_column, specs = PANELS[panel]
+    title = title or default_title
+    rows, truth = [], []
+    for spec in specs:
+        value = _sample_value(rng, spec, effects, incidental_rate)
+        low, high = _REF_BOUNDS[spec.key]
+        flag = _flag(value, low, high)
+        critical = _is_critical(spec.key, value)
+        name = spec.names[rng.integers(len(spec.names))]
+        result = format_value(value, spec.decimals, spec.thousands)
+        
+        row = {"test": name, "result": result, "unit": spec.unit, "range": spec.range}
+        if status_column:
+            row["status"] = _status(flag, critical)
+        if critical:
+            row["critical"] = True
+        rows.append(row)
+        truth.append({
+            'analyte': spec.key, 'test': name, 'section': title,
+            'value': value, 'result': result, 'unit': spec.unit, 'range': spec.range,
+            'ref_low': low, 'ref_high': high, 'flag': flag, 'critical': critical,
+        })
+    section = {"title": title, "rows": rows}
+    if status_column:
+        section["status_column"] = True
+    return section, truth
+
+
+def generate_case(seed, index, xhtml2pdf_fraction=0.1, max_serial=6, incidental_rate=0.05):
+    """
+    Build one synthetic case (no files written).
+    
+    Args:
+        seed: Corpus seed
+        index: Case number within the corpus
+        xhtml2pdf_fraction: Share of cases rendered with the xhtml2pdf layout
+        max_serial: Maximum extra serial cardiac panels (more panels -> more pages)
+        incidental_rate: Probability of a mild abnormality in an unaffected analyte
+    
+    Returns:
+        Dict with 'case_id', 'scenario', 'backend', the report_engine
+        'record' and ground-truth 'results'
+    """
+    rng = case_rng(seed, index)
+    scenario_name = _SCENARIO_NAMES[rng.choice(len(_SCENARIO_NAMES), p=_SCENARIO_WEIGHTS)]
+    scenario = SCENARIOS[scenario_name]
+    case_id = f"case_{index:06d}"
+    
+    gender = 'Male' if rng.random() < 0.55 else 'Female'
+    collected = BASE_DATE + timedelta(days=int(rng.integers(365)), minutes=int(rng.integers(6 * 60, 22 * 60)))
+    generated = collected + timedelta(minutes=int(rng.integers(45, 300)))
+    patient = {
+        "name": f"{rng.choice(FIRST_NAMES[gender])} {rng.choice(LAST_NAMES)}",
+        "age": int(rng.integers(*scenario['ages'])),
+        "gender": gender,
+        "report_id": f"SYN-{seed}-{index:06d}",
+        "report_date": collected.strftime("%d-%b-%Y"),
+        "referred_by": str(rng.choice(DOCTORS)),
+        "collection_time": collected.strftime("%I:%M %p"),
+        "clinical_history": str(rng.choice(scenario['history'])),
+        "sample_type": str(rng.choice(SAMPLE_TYPES)),
+    }
+    
+    effects = scenario['effects']
+    sections, results = [], []
+    section, truth = build_panel(rng, 'cardiac', effects, incidental_rate=incidental_rate)
+    sections.append(section)
+    results += truth
+    for panel in scenario['panels']:
+        if rng.random() < 0.7:
+            section, truth = build_panel(rng, panel, effects, incidental_rate=incidental_rate)
+            sections.append(section)
+            results += truth
+    # Serial cardiac markers, skewed towards short reports
+    n_serial = int(min(rng.geometric(0.45) - 1, max_serial))
+    for k in range(1, n_serial + 1):
+        section, truth = build_panel(rng, 'cardiac', effects, f"CARDIAC BIOMARKERS - SERIAL {k + 1} (+{3 * k}H)",
+                                     incidental_rate)
+        sections.append(section)
+        results += truth
+    
+    interpretation = list(scenario['interpretation'])
+    reported = set()
+    for result in results:
+        if result['critical'] and result['analyte'] not in reported:
+            reported.add(result['analyte'])
+            interpretation.append(f"Critical value: {result['test']} {result['result']} {result['unit']}.")
+    
+    record = {
+        "patient": patient,
+        "sections": sections,
+        "interpretation": interpretation,
+        "recommendation": scenario['recommendation'],
+        "pathologist": str(rng.choice(PATHOLOGISTS)),
+        "generated": generated.strftime("%d-%b-%Y %H:%M"),
+    }
+    return {
+        'case_id': case_id,
+        'seed': seed,
+        'index': index,
+        'scenario': scenario_name,
+        'backend': 'xhtml2pdf' if rng.random() < xhtml2pdf_fraction else 'reportlab',
+        'record': record,
+        'results': results,
+        'critical': sorted({r['analyte'] for r in results if r['critical']}),
+        'abnormal': sorted({r['analyte'] for r in results if r['flag'] != 'N'}),
+    }
+
+
+# --- Synthetic 12-lead ECG ---------------------------------------------------
+
+LEADS = ('I', 'II', 'III', 'aVR', 'aVL', 'aVF', 'V1', 'V2', 'V3', 'V4', 'V5', 'V6')
+# Standard 3x4 print layout: rows of (lead, column); each column shows 2.5 s
+ECG_LAYOUT = (('I', 'aVR', 'V1', 'V4'), ('II', 'aVL', 'V2', 'V5'), ('III', 'aVF', 'V3', 'V6'))
+RHYTHM_LEAD = 'II'
+ECG_FS = 500              # Hz, synthesized signal
+ECG_SECONDS = 10.0
+PX_PER_MM = 4
+MM_PER_SEC = 25.0
+MM_PER_MV = 10.0
+ECG_MARGIN_PX = 40
+ECG_ROW_PX = 140          # 35 mm between baselines
+
+# Wave components (P, Q, R, S, ST, T): centre (s from R peak), width (s)
+_WAVE_TIMING = np.array([[-0.20, 0.025], [-0.030, 0.010], [0.0, 0.012],
+                         [0.030, 0.012], [0.14, 0.055], [0.28, 0.050]])
+# Per-lead amplitudes in mV, columns P, Q, R, S, T (ST added per case)
+_WAVE_AMPLITUDE = np.array([
+    [0.10, -0.08, 0.80, -0.15, 0.25],   # I
+    [0.15, -0.05, 1.30, -0.20, 0.35],   # II
+    [0.05, -0.05, 0.60, -0.20, 0.15],   # III
+    [-0.12, 0.00, 0.15, -0.90, -0.25],  # aVR
+    [0.03, -0.08, 0.40, -0.20, 0.10],   # aVL
+    [0.10, -0.05, 0.90, -0.20, 0.25],   # aVF
+    [0.08, 0.00, 0.20, -1.00, 0.05],    # V1
+    [0.10, 0.00, 0.50, -1.30, 0.40],    # V2
+    [0.10, 0.00, 0.90, -0.80, 0.45],    # V3
+    [0.10, -0.05, 1.40, -0.40, 0.40],   # V4
+    [0.10, -0.08, 1.30, -0.20, 0.30],   # V5
+    [0.08, -0.08, 1.00, -0.10, 0.25],   # V6
+])
+
+
+def synthesize_ecg(rng, spec):
+    """
+    Synthesize a 10 s, 12-lead ECG as a sum of Gaussian waves per beat.
+    
+    Args:
+        rng: numpy Generator
+        spec: Scenario 'ecg' dict (rhythm, rate range, optional st, t_inverted,
+              t_peaked, voltage)
+    
+    Returns:
+        (signals [12, ECG_FS * ECG_SECONDS] float32 in mV, findings dict)
+    """
+    n = int(ECG_FS * ECG_SECONDS)
+    t = np.arange(n) / ECG_FS
+    rate = float(rng.uniform(*spec['rate']))
+    rr = 60.0 / rate
+    
+    if spec['rhythm'] == 'af':
+        intervals = rr * rng.uniform(0.6, 1.4, int(ECG_SECONDS / rr) + 4)
+    else:
+        intervals = rr * (1 + 0.03 * rng.standard_normal(int(ECG_SECONDS / rr) + 4))
+    beats = rng.uniform(0.1, 0.6) + np.concatenate([[0.0], np.cumsum(intervals)])
+    beats = beats[beats < ECG_SECONDS + 0.5]
+    
+    # Component waveforms [6, n]: each a sum of Gaussians over beats
+    offsets = t[None, :] - beats[:, None]                           # [beats, n]
+    centres, widths = _WAVE_TIMING[:, 0], _WAVE_TIMING[:, 1]
+    waves = np.exp(-0.5 * ((offsets[None] - centres[:, None, None]) / widths[:, None, None]) ** 2).sum(axis=1)
+    
+    amplitude = _WAVE_AMPLITUDE * rng.uniform(0.8, 1.2, (len(LEADS), 1)) * spec.get('voltage', 1.0)
+    st = np.zeros(len(LEADS))
+    for lead, (low, high) in spec.get('st', {}).items():
+        st[LEADS.index(lead)] = rng.uniform(low, high) / MM_PER_MV
+    amplitude[:, 4] += np.where(st > 0, st, 0)                      # hyperacute T with elevation
+    for lead in spec.get('t_inverted', ()):
+        amplitude[LEADS.index(lead), 4] = -abs(amplitude[LEADS.index(lead), 4])
+    if spec.get('t_peaked'):
+        amplitude[:, 4] *= 2.2
+    if spec['rhythm'] == 'af':
+        amplitude[:, 0] = 0.0
+    weights = np.column_stack([amplitude[:, :4], st, amplitude[:, 4]])   # P Q R S ST T
+    signals = weights @ waves
+    
+    if spec['rhythm'] == 'af':
+        # Fibrillatory baseline, 4-8 Hz
+        freqs = rng.uniform(4, 8, 3)
+        phases = rng.uniform(0, 2 * np.pi, (len(LEADS), 3))
+        signals += 0.04 * np.sin(2 * np.pi * freqs[None, :, None] * t + phases[:, :, None]).sum(axis=1)
+    wander = 0.05 * np.sin(2 * np.pi * rng.uniform(0.15, 0.4) * t + rng.uniform(0, 2 * np.pi))
+    signals += wander + 0.01 * rng.standard_normal(signals.shape)
+    
+    findings = {
+        'rhythm': 'atrial_fibrillation' if spec['rhythm'] == 'af' else 'sinus',
+        'heart_rate': round(60.0 * (np.count_nonzero(beats < ECG_SECONDS) / ECG_SECONDS)),
+        'st_deviation_mm': {lead: round(float(st[i] * MM_PER_MV), 2) for i, lead in enumerate(LEADS) if st[i]},
+        't_inverted': list(spec.get('t_inverted', ())),
+        't_peaked': bool(spec.get('t_peaked', False)),
+        'low_voltage': spec.get('voltage', 1.0) < 1.0,
+    }
+    return signals.astype(np.float32), findings
+
+
+def ecg_geometry(layout=ECG_LAYOUT, rhythm_leads=(RHYTHM_LEAD,)):
+    """
+    Pixel geometry of the printed ECG: image size, grid pitch and per-lead panels.
+    
+    Args:
+        layout: Rows of lead names sharing the 10 s width (default 3x4)
+        rhythm_leads: Full-width rhythm strips printed below the layout
+    """
+    px_per_sec = MM_PER_SEC * PX_PER_MM
+    column_sec = ECG_SECONDS / len(layout[0])
+    width = 2 * ECG_MARGIN_PX + int(ECG_SECONDS * px_per_sec)
+    height = 2 * ECG_MARGIN_PX + ECG_ROW_PX * (len(layout) + len(rhythm_leads))
+    panels = []
+    for row, leads in enumerate(tuple(layout) + tuple((lead,) for lead in rhythm_leads)):
+        baseline = ECG_MARGIN_PX + ECG_ROW_PX * row + ECG_ROW_PX // 2
+        seconds = column_sec if len(leads) > 1 else ECG_SECONDS
+        for col, lead in enumerate(leads):
+            x0 = ECG_MARGIN_PX + int(col * column_sec * px_per_sec)
+            panels.append({'lead': lead, 'row': row, 'col': col, 't0': col * column_sec, 't1': col * column_sec + seconds,
+                           'x0': x0, 'x1': x0 + int(seconds * px_per_sec), 'baseline_y': baseline})
+    return {
+        'width': width, 'height': height, 'px_per_mm': PX_PER_MM,
+        'mm_per_sec': MM_PER_SEC, 'mm_per_mv': MM_PER_MV,
+        'grid_origin': [ECG_MARGIN_PX, ECG_MARGIN_PX], 'panels': panels,
+    }
+
+
+_GRID_CACHE = {}
+
+
+def _grid_image(geometry):
+    """ECG paper background (cached per process): 1 mm minor, 5 mm major lines."""
+    key = (geometry['width'], geometry['height'])
+    if key not in _GRID_CACHE:
+        paper = np.empty((geometry['height'], geometry['width'], 3), np.uint8)
+        paper[:] = (255, 246, 246)
+        x0, y0 = geometry['grid_origin']
+        x1, y1 = geometry['width'] - ECG_MARGIN_PX, geometry['height'] - ECG_MARGIN_PX
+        paper[y0:y1 + 1:PX_PER_MM, x0:x1 + 1] = (248, 205, 205)
+        paper[y0:y1 + 1, x0:x1 + 1:PX_PER_MM] = (248, 205, 205)
+        paper[y0:y1 + 1:5 * PX_PER_MM, x0:x1 + 1] = (235, 140, 140)
+        paper[y0:y1 + 1, x0:x1 + 1:5 * PX_PER_MM] = (235, 140, 140)
+        _GRID_CACHE[key] = paper
+    return _GRID_CACHE[key]
+
+
+def render_ecg(signals, geometry=None):
+    """
+    Draw a 12-lead ECG print (3x4 layout plus rhythm strip by default) as a PIL image.
+    
+    Args:
+        signals: [12, n] mV at ECG_FS, lead order LEADS
+        geometry: ecg_geometry() (computed if omitted; pass one for other layouts)
+    """
+    from PIL import Image, ImageDraw
+    
+    geometry = geometry or ecg_geometry()
+    image = Image.fromarray(_grid_image(geometry))
+    draw = ImageDraw.Draw(image)
+    px_per_mv = MM_PER_MV * PX_PER_MM
+    px_per_sample = MM_PER_SEC * PX_PER_MM / ECG_FS
+    
+    for panel in geometry['panels']:
+        start, stop = int(panel['t0'] * ECG_FS), int(panel['t1'] * ECG_FS)
+        trace = signals[LEADS.index(panel['lead']), start:stop:2]
+        x = panel['x0'] + np.arange(len(trace)) * 2 * px_per_sample
+        y = np.clip(panel['baseline_y'] - trace * px_per_mv, 0, geometry['height'] - 1)
+        draw.line(list(zip(x.tolist(), y.tolist())), fill=(0, 0, 0), width=2)
+        draw.text((panel['x0'] + 6, panel['baseline_y'] - ECG_ROW_PX // 2 + 6), panel['lead'], fill=(0, 0, 0))
+        if panel['col']:
+            draw.line([(panel['x0'], panel['baseline_y'] - 12), (panel['x0'], panel['baseline_y'] + 12)],
+                      fill=(0, 0, 0), width=2)
+    draw.text((ECG_MARGIN_PX, 12), f"{MM_PER_SEC:g} mm/s   {MM_PER_MV:g} mm/mV   {ECG_FS} Hz", fill=(0, 0, 0))
+    return image
+
+
+# --- Corpus writing ------------------------------------------------------------
+
+_PAGE_RE = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+
+
+def pdf_page_count(pdf):
+    """Page count of an uncompressed-xref PDF (as written by reportlab) from its bytes."""
+    return len(_PAGE_RE.findall(pdf))
+
+
+def _init_worker():
+    """Byte-reproducible PDFs (no timestamps/random IDs) and renderers built up front."""
+    import logging
+    from reportlab import rl_config
+    from report_engine import get_renderer, RENDER_BACKENDS
+    
+    rl_config.invariant = 1
+    # xhtml2pdf warns about unsupported CSS once per document
+    logging.getLogger("xhtml2pdf").setLevel(logging.ERROR)
+    for backend in RENDER_BACKENDS:
+        get_renderer(backend)
+
+
+def _write_case(task):
+    """Generate and write one case; returns its manifest entry."""
+    from report_engine import render_record
+    
+    seed, index, out_dir, options = task
+    options = dict(options)
+    ecg, ecg_signals = options.pop('ecg'), options.pop('ecg_signals')
+    case = generate_case(seed, index, **options)
+    case_id = case['case_id']
+    files = {'report': f"reports/{case_id}.pdf", 'truth': f"truth/{case_id}.json"}
+    
+    pdf = render_record(case['record'], case['backend'])
+    with open(os.path.join(out_dir, files['report']), 'wb') as f:
+        f.write(pdf)
+    case['pages'] = pdf_page_count(pdf)
+    
+    if ecg:
+        rng = case_rng(seed, index, 1)
+        signals, case['ecg'] = synthesize_ecg(rng, SCENARIOS[case['scenario']]['ecg'])
+        files['ecg'] = f"ecg/{case_id}.png"
+        render_ecg(signals).save(os.path.join(out_dir, files['ecg']), compress_level=1)
+        if ecg_signals:
+            files['ecg_signals'] = f"ecg/{case_id}.npz"
+            np.savez_compressed(os.path.join(out_dir, files['ecg_signals']),
+                                signals_uv=np.round(signals * 1000).astype(np.int16),
+                                fs=ECG_FS, leads=np.array(LEADS))
+    
+    case['files'] = files
+    with open(os.path.join(out_dir, files['truth']), 'w', encoding='utf-8') as f:
+        json.dump(case, f, ensure_ascii=False)
+    return {'case_id': case_id, 'scenario': case['scenario'], 'backend': case['backend'],
+            'pages': case['pages'], 'critical': case['critical'], 'files': files}
+
+
+def generate_corpus(out_dir, count, seed=0, start=0, workers=None, chunksize=16, ecg=True,
+                    ecg_signals=False, xhtml2pdf_fraction=0.1, max_serial=6, incidental_rate=0.05):
+    """
+    Write a synthetic corpus of `count` cases across a process pool.
+    
+    Cases are independent of worker count and order; `start` offsets the
+    case indices so a corpus can be extended or regenerated in parts.
+    
+    Args:
+        out_dir: Output directory (see module docstring for the layout)
+        count: Number of cases
+        seed: Corpus seed
+        start: First case index
+        workers: Process count (default: os.cpu_count()); 0 generates in this process
+        chunksize: Cases sent to a worker per task
+        ecg: Also draw a 12-lead ECG image per case
+        ecg_signals: Also store the true ECG signals (int16 uV, .npz)
+        xhtml2pdf_fraction, max_serial, incidental_rate: See generate_case
+    
+    Returns:
+        Summary dict: cases, seconds, cases_per_sec, counts per backend,
+        scenario and page count
+    """
+    for sub in ('reports', 'truth', 'ecg') if ecg else ('reports', 'truth'):
+        os.makedirs(os.path.join(out_dir, sub), exist_ok=True)
+    options = {'ecg': ecg, 'ecg_signals': ecg_signals, 'xhtml2pdf_fraction': xhtml2pdf_fraction,
+               'max_serial': max_serial, 'incidental_rate': incidental_rate}
+    with open(os.path.join(out_dir, "corpus.json"), 'w', encoding='utf-8') as f:
+        json.dump({'seed': seed, 'start': start, 'count': count, 'options': options}, f, indent=2)
+    
+    tasks = ((seed, index, out_dir, options) for index in range(start, start + count))
+    summary = {'cases': 0, 'backends': {}, 'scenarios': {}, 'pages': {}}
+    begin = time.perf_counter()
+    
+    def record(entry):
+        summary['cases'] += 1
+        for key, value in (('backends', entry['backend']), ('scenarios', entry['scenario']),
+                           ('pages', str(entry['pages']))):
+            summary[key][value] = summary[key].get(value, 0) + 1
+        manifest.write(json.dumps(entry) + "\n")
+        if summary['cases'] % 1000 == 0:
+            print(f"  {summary['cases']}/{count} cases ({time.perf_counter() - begin:.1f}s)")
+    
+    mode = 'a' if start else 'w'
+    with open(os.path.join(out_dir, "manifest.jsonl"), mode, encoding='utf-8') as manifest:
+        if workers == 0:
+            _init_worker()
+            for task in tasks:
+                record(_write_case(task))
+        else:
+            workers = workers or os.cpu_count() or 1
+            window = workers * chunksize * 4
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                while True:
+                    batch = list(islice(tasks, window))
+                    if not batch:
+                        break
+                    for entry in pool.map(_write_case, batch, chunksize=chunksize):
+                        record(entry)
+    
+    elapsed = time.perf_counter() - begin
+    summary['seconds'] = elapsed
+    summary['cases_per_sec'] = summary['cases'] / elapsed if elapsed else 0.0
+    return summary
+
+
+def check_corpus(out_dir, limit=None, extractor=None):
+    """
+    Parse corpus PDFs with lab_parser and compare against the ground truth.
+    
+    Returns:
+        Dict with rows expected/matched, value and flag agreement, missed
+        critical values and unparsed lines
+    """
+    from lab_parser import parse_reports
+    
+    with open(os.path.join(out_dir, "manifest.jsonl"), 'r', encoding='utf-8') as f:
+        entries = [json.loads(line) for line in islice(f, limit)]
+    paths = [os.path.join(out_dir, entry['files']['report']) for entry in entries]
+    reports = parse_reports(paths, extractor)
+    
+    stats = {'reports': len(entries), 'rows': 0, 'matched': 0, 'value_ok': 0, 'flag_ok': 0,
+             'critical': 0, 'critical_missed': 0, 'unparsed': 0}
+    for entry, path in zip(entries, paths):
+        with open(os.path.join(out_dir, entry['files']['truth']), 'r', encoding='utf-8') as f:
+            truth = json.load(f)
+        parsed = {}
+        for result in reports[path]['results']:
+            parsed.setdefault((result['section'], result['analyte']), result)
+        stats['unparsed'] += len(reports[path]['unparsed'])
+        for expected in truth['results']:
+            stats['rows'] += 1
+            stats['critical'] += expected['critical']
+            result = parsed.get((expected['section'], expected['analyte']))
+            if result is None:
+                stats['critical_missed'] += expected['critical']
+                continue
+            stats['matched'] += 1
+            stats['value_ok'] += abs(result['value'] - expected['value']) <= 1e-6 * max(1.0, abs(expected['value']))
+            stats['flag_ok'] += result['flag'] == expected['flag']
+            stats['critical_missed'] += expected['critical'] and not result['critical']
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic blood-report/ECG case corpus")
+    parser.add_argument("out_dir")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start", type=int, default=0, help="First case index (extends an existing corpus)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (0 = in-process)")
+    parser.add_argument("--chunksize", type=int, default=16)
+    parser.add_argument("--xhtml2pdf-fraction", type=float, default=0.1)
+    parser.add_argument("--max-serial", type=int, default=6, help="Maximum extra serial cardiac panels")
+    parser.add_argument("--no-ecg", action="store_true", help="Skip ECG images")
+    parser.add_argument("--ecg-signals", action="store_true", help="Store true ECG signals (.npz)")
+    parser.add_argument("--check", type=int, metavar="N", help="Parse the first N reports and compare to truth")
+    args = parser.parse_args(argv)
+    
+    if args.check:
+        stats = check_corpus(args.out_dir, args.check)
+        print(json.dumps(stats, indent=2))
+        return
+    
+    summary = generate_corpus(args.out_dir, args.count, args.seed, args.start, args.workers, args.chunksize,
+                              ecg=not args.no_ecg, ecg_signals=args.ecg_signals,
+                              xhtml2pdf_fraction=args.xhtml2pdf_fraction, max_serial=args.max_serial)
+    print(f"Generated {summary['cases']} cases in {summary['seconds']:.1f}s "
+          f"({summary['cases_per_sec']:.1f} cases/sec)")
+    for key in ('backends', 'scenarios', 'pages'):
+        print(f"  {key}: " + ", ".join(f"{name}={n}" for name, n in sorted(summary[key].items())))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,80 @@
+"""
+Layout tests for ecg_digitizer on the repo's ECG images and synthetic prints.
+
+Usage:
+    python -m pytest -q test_ecg_digitizer.py
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("PIL")
+
+import ecg_digitizer
+import synthetic_corpus
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _signals(index=0):
+    scenario = list(synthetic_corpus.SCENARIOS)[index % len(synthetic_corpus.SCENARIOS)]
+    signals, _ = synthetic_corpus.synthesize_ecg(synthetic_corpus.case_rng(0, index, 1),
+                                                 synthetic_corpus.SCENARIOS[scenario]['ecg'])
+    return signals
+
+
+def _render(signals, layout, rhythm_leads):
+    geometry = synthetic_corpus.ecg_geometry(ecg_digitizer.LAYOUTS[layout], rhythm_leads)
+    return synthetic_corpus.render_ecg(signals, geometry)
+
+
+def test_choose_layout_six_rows_needs_explicit_layout():
+    with pytest.raises(ValueError):
+        ecg_digitizer.choose_layout(6)
+    layout, rows = ecg_digitizer.choose_layout(6, '6x2')
+    assert layout == '6x2' and len(rows) == 6
+    with pytest.raises(ValueError):
+        ecg_digitizer.choose_layout(7)
+
+
+def test_3x4_with_three_rhythm_strips():
+    ecg = ecg_digitizer.digitize(_render(_signals(), '3x4', ('V1', 'II', 'V5')))
+    assert ecg.layout == '3x4'
+    assert {'rhythm_V1', 'rhythm_II', 'rhythm_V5'} <= set(ecg.leads)
+
+
+def test_6x2_is_not_read_as_3x4():
+    signals = _signals()
+    image = _render(signals, '6x2', ())
+    with pytest.raises(ValueError):
+        ecg_digitizer.digitize(image)
+    
+    ecg = ecg_digitizer.digitize(image, layout='6x2')
+    assert ecg.layout == '6x2'
+    assert set(ecg.leads) == set(ecg_digitizer.LEADS)
+    # aVR is printed in the first half of row 4: its trace matches aVR best
+    t = np.arange(len(ecg.leads['aVR'])) / ecg.fs
+    correlations = [np.corrcoef(np.interp(t, np.arange(signals.shape[1]) / synthetic_corpus.ECG_FS, truth),
+                                ecg.leads['aVR'])[0, 1] for truth in signals]
+    assert ecg_digitizer.LEADS[int(np.argmax(correlations))] == 'aVR'
+
+
+def test_nstenu_is_not_labelled_3x4():
+    path = os.path.join(HERE, "nstenu.png")
+    if not os.path.exists(path):
+        pytest.skip("nstenu.png not present")
+    with pytest.raises(ValueError, match="6x2"):
+        ecg_digitizer.digitize(path)
+    ecg = ecg_digitizer.digitize(path, layout='6x2')
+    assert ecg.layout == '6x2'
+    assert len(ecg.leads) == 12
+
+
+def test_no_trace_raises():
+    path = os.path.join(HERE, "images.jpg")
+    if not os.path.exists(path):
+        pytest.skip("images.jpg not present")
+    with pytest.raises(ValueError):
+        ecg_digitizer.digitize(path)
@@ -0,0 +1,47 @@
+"""
+Tests for ecg_retrieval_index.ECGEmbeddingIndex.
+
+Usage:
+    python -m pytest -q test_ecg_retrieval_index.py
+"""
+
+import numpy as np
+import pytest
+
+from ecg_retrieval_index import ECGEmbeddingIndex
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(0).standard_normal((4, 16)).astype(np.float32)
+
+
+def test_duplicate_case_id_in_one_batch(tmp_path, vectors):
+    index = ECGEmbeddingIndex(str(tmp_path / "index"), dim=16)
+    ids = index.add(vectors[:2], [{'case_id': 'dup'}, {'case_id': 'dup'}])
+    assert len(index) == 1
+    matches = index.search(vectors[0], top_k=4)
+    assert [m['id'] for m in matches] == [ids[1]]
+    
+    # The tombstone is persisted
+    reopened = ECGEmbeddingIndex(str(tmp_path / "index"))
+    assert len(reopened) == 1
+    assert reopened.delete(case_ids=['dup']) == 1
+    assert len(reopened) == 0
+
+
+def test_readding_case_id_replaces_entry(tmp_path, vectors):
+    index = ECGEmbeddingIndex(str(tmp_path / "index"), dim=16)
+    index.add(vectors[:2], [{'case_id': 'a'}, {'case_id': 'b'}])
+    (new,) = index.add(vectors[2], {'case_id': 'a'})
+    assert len(index) == 2
+    assert {m['id'] for m in index.search(vectors[0], top_k=4)} == {1, new}
+
+
+def test_search_rejects_bad_arguments(tmp_path, vectors):
+    index = ECGEmbeddingIndex(str(tmp_path / "index"), dim=16)
+    index.add(vectors)
+    with pytest.raises(ValueError):
+        index.search(vectors[0], top_k=0)
+    with pytest.raises(ValueError):
+        index.search(vectors[0], mode='ivf')
@@ -0,0 +1,61 @@
+"""
+Batch-failure tests for extract_text.PDFTextExtractor.
+
+Usage:
+    python -m pytest -q test_extract_text.py
+"""
+
+import os
+
+import pytest
+
+pdf_backends = pytest.importorskip("pdf_backends")
+if not pdf_backends.available_backends():
+    pytest.skip("no PDF text extraction backend installed", allow_module_level=True)
+
+from extract_text import PDFTextExtractor, ExtractionError
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GOOD = [os.path.join(HERE, name) for name in ("sample_blood_report.pdf", "blood_report_unbiased.pdf")]
+
+
+@pytest.fixture
+def paths(tmp_path):
+    for path in GOOD:
+        if not os.path.exists(path):
+            pytest.skip(f"{os.path.basename(path)} not present")
+    corrupt = tmp_path / "corrupt.pdf"
+    corrupt.write_bytes(b"not a pdf")
+    missing = str(tmp_path / "missing.pdf")
+    return [GOOD[0], missing, str(corrupt), GOOD[1]], {missing, str(corrupt)}
+
+
+def test_bad_documents_do_not_stop_the_batch(tmp_path, paths):
+    paths, bad = paths
+    cache_dir = tmp_path / "cache"
+    extractor = PDFTextExtractor(cache_dir=str(cache_dir), max_workers=2)
+    
+    documents = []
+    with pytest.raises(ExtractionError) as error:
+        for path, pages in extractor.iter_documents(paths):
+            documents.append(path)
+            assert pages
+    assert documents == GOOD
+    assert set(error.value.failures) == bad
+    assert isinstance(error.value.failures[paths[1]], FileNotFoundError)
+    # The readable documents were cached
+    assert len(os.listdir(cache_dir)) == len(GOOD)
+
+
+def test_bad_documents_while_streaming_pages(paths):
+    paths, bad = paths
+    extractor = PDFTextExtractor(cache_dir=None, max_workers=2)
+    
+    pages = []
+    with pytest.raises(ExtractionError) as error:
+        for path, page_number, _ in extractor.iter_pages(paths):
+            pages.append((path, page_number))
+    assert set(error.value.failures) == bad
+    for path in GOOD:
+        numbers = [number for p, number in pages if p == path]
+        assert numbers == list(range(1, len(numbers) + 1)) and numbers
@@ -0,0 +1,105 @@
+"""
+Regression tests for lab_parser on the repo's own report layouts.
+
+Usage:
+    python -m pytest -q test_lab_parser.py
+"""
+
+import pytest
+
+import lab_parser
+
+
+def _troponin(report):
+    return [r for r in report['results'] if r['analyte'] == 'troponin_i']
+
+
+@pytest.fixture(scope="module")
+def xhtml2pdf_report(tmp_path_factory):
+    pytest.importorskip("xhtml2pdf")
+    import generate_report_pdf
+    path = tmp_path_factory.mktemp("reports") / "xhtml2pdf.pdf"
+    assert generate_report_pdf.create_report(str(path)) == 0
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def reportlab_report(tmp_path_factory):
+    pytest.importorskip("reportlab")
+    import generate_report_pdf_v2
+    path = tmp_path_factory.mktemp("reports") / "reportlab.pdf"
+    generate_report_pdf_v2.create_report(str(path), generate_report_pdf_v2.SAMPLE_RECORD,
+                                         generate_report_pdf_v2.build_styles())
+    return str(path)
+
+
+@pytest.mark.parametrize("backend", ["pymupdf", "pypdf"])
+@pytest.mark.parametrize("layout", ["xhtml2pdf_report", "reportlab_report"])
+def test_generated_layouts(request, layout, backend):
+    pdf_backends = pytest.importorskip("pdf_backends")
+    if backend not in pdf_backends.available_backends():
+        pytest.skip(f"{backend} not installed")
+    path = request.getfixturevalue(layout)
+    report = lab_parser.parse_report_text(pdf_backends.extract_pages(path, backend=backend)[1])
+    
+    assert len(report['results']) == 12
+    assert report['unparsed'] == []
+    # The wrapped "Cardiac Troponin I (High Sensitivity)" name stays one row
+    troponin, = _troponin(report)
+    assert troponin['value'] == pytest.approx(52.48)
+    assert troponin['critical']
+    assert troponin in report['critical']
+    sections = {r['section'] for r in report['results']}
+    assert any('CARDIAC' in (s or '') for s in sections)
+
+
+def test_value_glued_to_name():
+    match = lab_parser.ROW_RE.match("Cardiac Troponin I (High Sensitivity)52.480 ng/mL < 0.04 CRITICAL HIGH")
+    assert match is not None
+    assert match.group('name') == "Cardiac Troponin I (High Sensitivity)"
+    assert match.group('value') == "52.480"
+    # Interleaved glyphs must not be read as a (wrong) value
+    assert lab_parser.ROW_RE.match("Troponin I (High Sensitivity5)2.480 ng/mL < 0.04") is None
+
+
+def test_range_glued_to_unit():
+    match = lab_parser.ROW_RE.match("eGFR 108 mL/min/1.73m2> 90")
+    assert match.group('unit') == "mL/min/1.73m2"
+    assert match.group('range') == "> 90"
+
+
+def test_wrapped_names():
+    text = "\n".join([
+        "CARDIAC BIOMARKERS",
+        "Test Result Unit Reference Range Status",
+        "Cardiac Troponin I (High",
+        "Sensitivity) 52.480 ng/mL < 0.04 CRITICAL HIGH",
+        "B-type Natriuretic 890 pg/mL < 100 HIGH",
+        "Peptide",
+        "Myoglobin 45 ng/mL 25 - 72 NORMAL",
+    ])
+    report = lab_parser.parse_report_text(text)
+    names = [r['raw_name'] for r in report['results']]
+    assert names == ["Cardiac Troponin I (High Sensitivity)", "B-type Natriuretic Peptide", "Myoglobin"]
+    assert [r['analyte'] for r in report['results']] == ['troponin_i', 'bnp', 'myoglobin']
+
+
+def test_describe_uses_normalized_range():
+    report = lab_parser.parse_report_text("Test Result Unit Reference Range\nTroponin I 52 ng/L < 14 HIGH")
+    prompt = lab_parser.format_for_prompt(report)
+    assert "Troponin I 0.052 ng/mL (high, ref < 0.014)" in prompt
+
+
+def test_prompt_includes_unparsed_critical():
+    report = {
+        'results': [], 'critical': [], 'abnormal': [],
+        'unparsed': [
+            {'line': "Troponin I (High Sensitivity5)2.480 ng/mL < 0.04 CRITICAL HIGH", 'section': None, 'page': 1},
+            {'line': "Myoglobin 4x5 ng/mL 25 - 72", 'section': None, 'page': 1},
+            {'line': "Page 1 of 2 < 3", 'section': None, 'page': 1},
+        ],
+    }
+    prompt = lab_parser.format_for_prompt(report).splitlines()
+    assert prompt[0].startswith("CRITICAL (unparsed): Troponin I")
+    assert "UNPARSED: Myoglobin 4x5 ng/mL 25 - 72" in prompt
+    assert len(prompt) == 2